@@ -32,15 +32,20 @@ function htmlResponse(html, status = 200) {
   });
 }
 
-// Helper: Hash password using SHA-256
-async function hashPassword(password) {
+// Helper: SHA-256 of a string as hex
+async function sha256Hex(text) {
   const encoder = new TextEncoder();
-  const data = encoder.encode(password);
+  const data = encoder.encode(text);
   const hashBuffer = await crypto.subtle.digest('SHA-256', data);
   const hashArray = Array.from(new Uint8Array(hashBuffer));
   return hashArray.map(b => b.toString(16).padStart(2, '0')).join('');
 }
 
+// Helper: Hash password using SHA-256
+async function hashPassword(password) {
+  return sha256Hex(password);
+}
+
 // Helper: Authenticate request via API key or Bearer token
 async function authenticate(request, env) {
   const apiKey = request.headers.get('X-API-Key') ||
@@ -454,6 +459,62 @@ async function handleUpload(request, env, user) {
   });
 }
 
+// POST /api/append - Append new utterances to existing transcripts
+async function handleAppend(request, env, user) {
+  const { appends } = await request.json();
+
+  if (!appends || !Array.isArray(appends)) {
+    return errorResponse('appends array is required');
+  }
+
+  let appended = 0;
+  const rejected = [];
+
+  for (const item of appends) {
+    const key = `transcript:${user.id}:${item.id}`;
+    const existing = await env.TRANSCRIPTS.get(key);
+    if (!existing) {
+      rejected.push(item.id);
+      continue;
+    }
+
+    const stored = JSON.parse(existing);
+    const current = stored.transcript || '';
+    if (await sha256Hex(current) !== item.base_hash) {
+      rejected.push(item.id);
+      continue;
+    }
+
+    const added = item.transcript || '';
+    const { base_hash, base_utterances, ...fields } = item;
+    const data = {
+      ...stored,
+      ...fields,
+      transcript: current && added ? `${current}\n${added}` : current + added,
+      uploadedAt: new Date().toISOString(),
+    };
+
+    await env.TRANSCRIPTS.put(key, JSON.stringify(data));
+    appended++;
+  }
+
+  if (appended > 0) {
+    const indexKey = `index:${user.id}`;
+    const existingIndex = await env.TRANSCRIPTS.get(indexKey);
+    if (existingIndex) {
+      const index = JSON.parse(existingIndex);
+      index.lastUpdated = new Date().toISOString();
+      await env.TRANSCRIPTS.put(indexKey, JSON.stringify(index));
+    }
+  }
+
+  return jsonResponse({
+    message: 'Append successful',
+    appended,
+    rejected,
+  });
+}
+
 // GET /api/transcripts - List user's transcripts
 async function handleListTranscripts(request, env, user) {
   const url = new URL(request.url);
@@ -669,6 +730,10 @@ export default {
       return handleUpload(request, env, user);
     }
 
+    if (path === '/api/append' && method === 'POST') {
+      return handleAppend(request, env, user);
+    }
+
     if (path === '/api/transcripts' && method === 'GET') {
       return handleListTranscripts(request, env, user);
     }
@@ -0,0 +1,94 @@
+"""Import-time budget check for the granola-sync CLI.
+
+Runs ``python -X importtime -c "import granola_sync.cli"`` a few times and
+fails if the best cumulative import time exceeds the budget, or if any of
+the heavy modules that commands are supposed to import lazily were loaded.
+
+Usage:
+    python benchmarks/import_time.py [--budget-ms 80] [--runs 5]
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, Tuple
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+
+# Modules that must not be imported just to build the command group.
+LAZY_MODULES = (
+    "rich",
+    "requests",
+    "granola_sync.api",
+    "granola_sync.cloud",
+    "granola_sync.export",
+)
+
+LINE_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)$")
+
+
+def measure(module: str = "granola_sync.cli") -> Tuple[int, Dict[str, int]]:
+    """Import ``module`` in a fresh interpreter.
+
+    Returns the cumulative import time of ``module`` in microseconds and a
+    mapping of every module that was imported to its cumulative time.
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        p for p in (str(SRC_DIR), env.get("PYTHONPATH", "")) if p
+    )
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    modules = {}
+    for line in proc.stderr.splitlines():
+        match = LINE_RE.match(line)
+        if match:
+            modules[match.group(4)] = int(match.group(2))
+
+    return modules.get(module, 0), modules
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=80.0,
+                        help="Maximum cumulative import time (default: 80ms)")
+    parser.add_argument("--runs", type=int, default=5,
+                        help="Number of fresh interpreters to sample (default: 5)")
+    args = parser.parse_args()
+
+    samples = []
+    modules: Dict[str, int] = {}
+    for _ in range(args.runs):
+        total_us, modules = measure()
+        samples.append(total_us)
+
+    best_ms = min(samples) / 1000
+    print(f"granola_sync.cli import: best {best_ms:.1f}ms "
+          f"over {args.runs} runs (budget {args.budget_ms:.0f}ms)")
+
+    failed = False
+    eager = [
+        lazy for lazy in LAZY_MODULES
+        if any(name == lazy or name.startswith(lazy + ".") for name in modules)
+    ]
+    if eager:
+        print(f"FAIL: imported eagerly: {', '.join(eager)}")
+        failed = True
+
+    if best_ms > args.budget_ms:
+        print("FAIL: import time over budget")
+        failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
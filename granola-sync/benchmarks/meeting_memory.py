@@ -0,0 +1,159 @@
+"""Compare the memory held by raw document dicts and compact Meeting records.
+
+Builds a synthetic library shaped like ``/v2/get-documents`` output (attendee
+profiles, ``last_viewed_panel``, ProseMirror notes) and a set of transcripts,
+parses it page by page the way the client does, and reports the bytes per
+meeting and per utterance still allocated when the run keeps raw dicts
+versus :class:`~granola_sync.models.Meeting` and
+:class:`~granola_sync.models.Utterance` objects.
+
+Usage:
+    python benchmarks/meeting_memory.py [--meetings 10000] [--transcripts 200]
+"""
+import argparse
+import gc
+import json
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from granola_sync.models import Meeting, Utterance  # noqa: E402
+
+PEOPLE = ["Alice Chen", "Bob Okafor", "Carla Diaz", "Dev Patel", "Eve Martin", "Farid Haddad"]
+WORDS = "budget roadmap hiring launch customer review pricing design metrics follow-up".split()
+PAGE_SIZE = 500
+
+
+def person(name: str) -> dict:
+    first = name.split()[0].lower()
+    return {
+        "name": name,
+        "email": f"{first}@example.com",
+        "details": {
+            "person": {
+                "name": {"fullName": name, "givenName": name.split()[0]},
+                "avatar": f"https://avatars.example.com/{first}.png",
+                "employment": {"title": "Engineer", "name": "Example Inc"},
+                "linkedin": {"handle": f"in/{first}"},
+            },
+            "company": {"name": "Example Inc", "domain": "example.com"},
+        },
+        "responseStatus": "accepted",
+    }
+
+
+def prosemirror(text: str) -> dict:
+    return {
+        "type": "doc",
+        "content": [
+            {"type": "heading", "attrs": {"level": 3}, "content": [{"type": "text", "text": "Notes"}]},
+            {"type": "bulletList", "content": [
+                {"type": "listItem", "content": [
+                    {"type": "paragraph", "content": [{"type": "text", "text": f"{text} {k}"}]},
+                ]}
+                for k in range(6)
+            ]},
+        ],
+    }
+
+
+def synthetic_page(start: int, count: int) -> bytes:
+    """One serialized page of documents, so strings aren't shared between them."""
+    docs = []
+    for i in range(start, start + count):
+        topic = " ".join(WORDS[(i + k) % len(WORDS)] for k in range(4))
+        notes = prosemirror(topic)
+        docs.append({
+            "id": f"0b6c8f0e-{i:08d}-4d2a-9b1e-5f3c7a9d2e10",
+            "title": f"Weekly {WORDS[i % len(WORDS)]} sync",
+            "created_at": "2024-01-15T10:00:00.000Z",
+            "updated_at": "2024-01-15T11:02:00.000Z",
+            "deleted_at": None,
+            "summary": f"Discussed {topic}.",
+            "notes": notes,
+            "notes_plain": "",
+            "notes_markdown": "",
+            "people": [person(PEOPLE[(i + k) % len(PEOPLE)]) for k in range(3)],
+            "last_viewed_panel": {
+                "id": f"panel-{i}",
+                "title": "Summary",
+                "content": notes,
+                "template_slug": "meeting-summary",
+                "updated_at": "2024-01-15T11:02:00.000Z",
+            },
+            "google_calendar_event": {"id": f"evt-{i}", "summary": "Weekly sync", "attendees": []},
+        })
+    return json.dumps({"docs": docs}).encode()
+
+
+def synthetic_transcript(i: int, utterances: int) -> bytes:
+    return json.dumps([
+        {
+            "id": f"utt-{i}-{j}",
+            "document_id": f"doc-{i}",
+            "speaker": PEOPLE[(i + j) % len(PEOPLE)],
+            "source": "microphone",
+            "text": " ".join(WORDS[(i + j + k) % len(WORDS)] for k in range(12)),
+            "start_timestamp": "2024-01-15T10:00:00.000Z",
+            "end_timestamp": "2024-01-15T10:00:04.000Z",
+            "is_final": True,
+        }
+        for j in range(utterances)
+    ]).encode()
+
+
+def measure(build) -> int:
+    """Bytes still allocated by ``build()``'s result once it returns."""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--meetings", type=int, default=10000)
+    parser.add_argument("--transcripts", type=int, default=200)
+    parser.add_argument("--utterances", type=int, default=200, help="Utterances per transcript")
+    args = parser.parse_args()
+
+    pages = [
+        synthetic_page(start, min(PAGE_SIZE, args.meetings - start))
+        for start in range(0, args.meetings, PAGE_SIZE)
+    ]
+    transcripts = [synthetic_transcript(i, args.utterances) for i in range(args.transcripts)]
+    utterance_count = args.transcripts * args.utterances
+
+    def raw_documents():
+        return [doc for page in pages for doc in json.loads(page)["docs"]]
+
+    def meetings():
+        return [Meeting.from_api(doc) for page in pages for doc in json.loads(page)["docs"]]
+
+    def raw_utterances():
+        return [json.loads(t) for t in transcripts]
+
+    def utterances():
+        return [[Utterance.from_api(u) for u in json.loads(t)] for t in transcripts]
+
+    rows = [
+        ("meeting", args.meetings, measure(raw_documents), measure(meetings)),
+        ("utterance", utterance_count, measure(raw_utterances), measure(utterances)),
+    ]
+
+    print(f"{'':10} {'raw dicts':>14} {'slotted':>14} {'saved':>7}")
+    for name, count, raw, compact in rows:
+        print(f"{name:10} {raw / count:11.0f} B {compact / count:11.0f} B "
+              f"{1 - compact / raw:6.0%}")
+        print(f"{'  total':10} {raw / 1024 / 1024:10.1f} MB {compact / 1024 / 1024:10.1f} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
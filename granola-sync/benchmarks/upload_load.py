@@ -0,0 +1,87 @@
+"""Load test the cloud upload path against the local reference server.
+
+Starts ``granola_sync.server`` on a temporary SQLite database, registers a
+user, and uploads synthetic transcripts through ``CloudClient`` in batches
+from several threads, then reports upload and search throughput.
+
+Usage:
+    python benchmarks/upload_load.py [--transcripts 5000] [--batch-size 50] [--threads 4]
+"""
+import argparse
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from granola_sync.cloud import CloudClient  # noqa: E402
+from granola_sync.server import create_server  # noqa: E402
+
+WORDS = "budget roadmap hiring launch customer review pricing design metrics follow-up".split()
+
+
+def synthetic_transcript(i: int, utterances: int) -> dict:
+    lines = [
+        f"Speaker {j % 4}: {' '.join(WORDS[(i + j + k) % len(WORDS)] for k in range(12))}"
+        for j in range(utterances)
+    ]
+    return {
+        "id": f"meeting-{i}",
+        "title": f"Meeting {i}",
+        "date": "2024-01-15",
+        "created_at": "2024-01-15T10:00:00Z",
+        "attendees": ["Alice", "Bob"],
+        "summary": f"Discussed {WORDS[i % len(WORDS)]}",
+        "notes": "",
+        "transcript": "\n".join(lines),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--transcripts", type=int, default=5000)
+    parser.add_argument("--utterances", type=int, default=200, help="Utterances per transcript")
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        server = create_server(Path(tmp) / "load.db", port=0, quiet=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        api_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+        api_key = CloudClient.register(api_url, "load@example.com", "load-test")["api_key"]
+        client = CloudClient(api_url, api_key)
+
+        batches = [
+            [synthetic_transcript(i, args.utterances)
+             for i in range(start, min(start + args.batch_size, args.transcripts))]
+            for start in range(0, args.transcripts, args.batch_size)
+        ]
+        payload_mb = sum(len(t["transcript"]) for b in batches for t in b) / 1024 / 1024
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(args.threads) as pool:
+            list(pool.map(client.upload_transcripts, batches))
+        upload_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        searches = 100
+        for i in range(searches):
+            client.search(WORDS[i % len(WORDS)])
+        search_s = time.perf_counter() - started
+
+        server.shutdown()
+        server.server_close()
+
+    print(f"Uploaded {args.transcripts} transcripts ({payload_mb:.1f} MB) in {upload_s:.2f}s "
+          f"= {args.transcripts / upload_s:.0f} transcripts/s")
+    print(f"{searches} searches in {search_s:.2f}s = {search_s / searches * 1000:.1f}ms each")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
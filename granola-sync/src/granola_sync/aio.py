@@ -0,0 +1,256 @@
+"""Asyncio clients for embedding granola-sync in services.
+
+These mirror :class:`~granola_sync.api.GranolaClient` and
+:class:`~granola_sync.cloud.CloudClient` and reuse their request building
+and response normalization. Many clients can share one pooled
+``aiohttp.ClientSession`` (see :func:`create_session`) and one semaphore, so
+a single event loop can drive syncs for hundreds of users.
+
+Requires the ``async`` extra: ``pip install 'granola-sync[async]'``.
+"""
+import asyncio
+import json
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+try:
+    import aiohttp
+except ImportError as e:  # pragma: no cover - depends on installed extras
+    raise ImportError(
+        "granola_sync.aio requires aiohttp. "
+        "Install it with: pip install 'granola-sync[async]'"
+    ) from e
+
+from .api import (
+    BASE_URL,
+    CREDENTIALS_PATH,
+    access_token_from_credentials,
+    build_headers,
+    documents_payload,
+    load_credentials,
+    parse_documents,
+    parse_transcript,
+)
+from .cloud import CloudAPIError, cloud_headers, error_message, prepare_transcript_for_upload
+from .config import get_api_url, get_api_key
+from .latency import DEFAULT_TIMEOUT
+from .models import Meeting
+
+
+def create_session(
+    max_connections: int = 100,
+    max_connections_per_host: int = 0,
+    timeout: float = DEFAULT_TIMEOUT,
+) -> "aiohttp.ClientSession":
+    """Create a pooled HTTP session that several clients can share.
+
+    ``timeout`` bounds connecting and each wait for response data, like the
+    ``requests`` timeout the sync clients use, rather than the whole
+    request, so large uploads and long transcripts aren't cut off while
+    data is still flowing. Must be called from inside a running event loop.
+    The caller owns the session and must close it.
+    """
+    connector = aiohttp.TCPConnector(limit=max_connections, limit_per_host=max_connections_per_host)
+    timeout = aiohttp.ClientTimeout(total=None, sock_connect=timeout, sock_read=timeout)
+    return aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+
+class _AsyncClientBase:
+    """Session ownership and concurrency limiting shared by the async clients."""
+
+    def __init__(
+        self,
+        session: Optional["aiohttp.ClientSession"],
+        concurrency: int,
+        semaphore: Optional[asyncio.Semaphore],
+    ):
+        self._session = session
+        self._owns_session = session is None
+        self._concurrency = concurrency
+        self._semaphore = semaphore
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        """Limit on this client's in-flight requests."""
+        # Created lazily so it binds to the running loop on Python 3.9.
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._concurrency)
+        return self._semaphore
+
+    @property
+    def session(self) -> "aiohttp.ClientSession":
+        if self._session is None:
+            self._session = create_session()
+        return self._session
+
+    async def close(self):
+        """Close the session if this client created it."""
+        if self._owns_session and self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+
+class AsyncGranolaClient(_AsyncClientBase):
+    """Asyncio client for Granola's API."""
+
+    BASE_URL = BASE_URL
+
+    def __init__(
+        self,
+        credentials_path: Optional[Path] = None,
+        *,
+        session: Optional["aiohttp.ClientSession"] = None,
+        concurrency: int = 8,
+        semaphore: Optional[asyncio.Semaphore] = None,
+    ):
+        super().__init__(session, concurrency, semaphore)
+        self.credentials_path = Path(credentials_path) if credentials_path else CREDENTIALS_PATH
+        self.token = access_token_from_credentials(load_credentials(self.credentials_path))
+
+    async def _post(self, path: str, payload: Dict[str, Any]) -> Any:
+        async with self.semaphore:
+            async with self.session.post(
+                f"{self.BASE_URL}{path}", headers=build_headers(self.token), json=payload
+            ) as resp:
+                resp.raise_for_status()
+                return await resp.json(content_type=None)
+
+    async def iter_documents(self, limit: int = 500) -> AsyncIterator[Dict]:
+        """Yield all documents, fetching one page at a time."""
+        offset = 0
+        while True:
+            data = await self._post("/v2/get-documents", documents_payload(limit, offset))
+            docs = parse_documents(data)
+
+            if not docs:
+                break
+
+            for doc in docs:
+                yield doc
+
+            if len(docs) < limit:
+                break
+
+            offset += limit
+
+    async def get_documents(self, limit: int = 500) -> List[Dict]:
+        """Fetch all documents from Granola."""
+        return [doc async for doc in self.iter_documents(limit)]
+
+    async def get_transcript(self, document_id: str) -> Optional[List[Dict]]:
+        """Fetch transcript for a specific document.
+
+        Returns ``None`` if Granola has no transcript for it (404). Other
+        failures, including timeouts, are raised so callers can skip the
+        document instead of treating it as having no transcript.
+        """
+        try:
+            data = await self._post("/v1/get-document-transcript", {"document_id": document_id})
+        except aiohttp.ClientResponseError as e:
+            if e.status == 404:
+                return None
+            raise
+        return parse_transcript(data)
+
+    def get_user_info(self) -> dict:
+        """Get current user info from credentials."""
+        data = load_credentials(self.credentials_path)
+        return json.loads(data.get('user_info', '{}'))
+
+
+class AsyncCloudClient(_AsyncClientBase):
+    """Asyncio client for the Granola cloud API."""
+
+    def __init__(
+        self,
+        api_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        *,
+        session: Optional["aiohttp.ClientSession"] = None,
+        concurrency: int = 4,
+        semaphore: Optional[asyncio.Semaphore] = None,
+    ):
+        super().__init__(session, concurrency, semaphore)
+        self.api_url = api_url or get_api_url()
+        self.api_key = api_key or get_api_key()
+
+        if not self.api_url:
+            raise CloudAPIError("API URL not configured. Run 'granola-sync login' first.")
+        if not self.api_key:
+            raise CloudAPIError("API key not configured. Run 'granola-sync login' first.")
+
+    async def _request(self, method: str, path: str, **kwargs) -> Dict[str, Any]:
+        async with self.semaphore:
+            async with self.session.request(
+                method, f"{self.api_url}{path}", headers=cloud_headers(self.api_key), **kwargs
+            ) as resp:
+                if resp.status >= 400:
+                    raise CloudAPIError(f"API error ({resp.status}): {error_message(await resp.text())}",
+                                        resp.status)
+                return await resp.json(content_type=None)
+
+    async def upload_transcripts(self, transcripts: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Upload transcripts to the cloud."""
+        return await self._request("POST", "/api/upload", json={"transcripts": transcripts})
+
+    async def list_transcripts(self, limit: int = 50, offset: int = 0) -> Dict[str, Any]:
+        """List transcripts in the cloud."""
+        return await self._request("GET", "/api/transcripts", params={"limit": limit, "offset": offset})
+
+    async def search(self, query: str, limit: int = 20) -> Dict[str, Any]:
+        """Search transcripts."""
+        return await self._request("GET", "/api/search", params={"q": query, "limit": limit})
+
+    async def get_stats(self) -> Dict[str, Any]:
+        """Get user stats."""
+        return await self._request("GET", "/api/stats")
+
+
+async def upload_account(
+    granola: AsyncGranolaClient,
+    cloud: AsyncCloudClient,
+    limit: Optional[int] = None,
+    batch_size: int = 50,
+) -> Dict[str, int]:
+    """Upload one account's transcripts, the async equivalent of ``granola-sync upload``.
+
+    Transcripts for each batch are fetched concurrently (bounded by the
+    Granola client's semaphore) and uploaded before the next batch starts,
+    so memory stays proportional to ``batch_size``. Documents whose
+    transcript can't be fetched are skipped and counted in ``skipped``.
+    """
+    documents = [
+        Meeting.from_api(d) async for d in granola.iter_documents() if not d.get('deleted_at')
+    ]
+    if limit:
+        documents = documents[:limit]
+
+    uploaded = 0
+    updated = 0
+    skipped = 0
+    for i in range(0, len(documents), batch_size):
+        batch = documents[i:i + batch_size]
+        transcripts = await asyncio.gather(
+            *(granola.get_transcript(d.id) for d in batch), return_exceptions=True
+        )
+        to_upload = []
+        for doc, transcript in zip(batch, transcripts):
+            if isinstance(transcript, Exception):
+                skipped += 1
+                continue
+            if isinstance(transcript, BaseException):
+                raise transcript
+            to_upload.append(prepare_transcript_for_upload(doc, transcript))
+        if not to_upload:
+            continue
+        result = await cloud.upload_transcripts(to_upload)
+        uploaded += result.get('uploaded', 0)
+        updated += result.get('updated', 0)
+
+    return {"documents": len(documents), "uploaded": uploaded, "updated": updated, "skipped": skipped}
@@ -1,88 +1,201 @@
 """Granola API client."""
 import json
 from pathlib import Path
-from typing import Optional, List, Dict
+from typing import Any, Iterator, Optional, List, Dict
 import requests
+from urllib3.exceptions import ReadTimeoutError
+
+from .latency import RequestPolicy
+from .models import Meeting, Utterance
+from .streaming import iter_json_items
+
+BASE_URL = "https://api.granola.ai"
+CREDENTIALS_PATH = Path.home() / "Library/Application Support/Granola/supabase.json"
+USER_AGENT = "Granola/5.354.0"
+
+
+def load_credentials(path: Path) -> Dict[str, Any]:
+    """Read Granola's local credentials file."""
+    if not path.exists():
+        raise FileNotFoundError(
+            f"Granola credentials not found at {path}\n"
+            "Make sure Granola is installed and you're logged in."
+        )
+
+    with open(path) as f:
+        return json.load(f)
+
+
+def access_token_from_credentials(data: Dict[str, Any]) -> str:
+    """Extract the API access token from a credentials payload."""
+    tokens = json.loads(data['workos_tokens'])
+    return tokens['access_token']
+
+
+def build_headers(token: str) -> Dict[str, str]:
+    """Build request headers for the Granola API."""
+    return {
+        "Authorization": f"Bearer {token}",
+        "Content-Type": "application/json",
+        "User-Agent": USER_AGENT
+    }
+
+
+def documents_payload(limit: int, offset: int) -> Dict[str, Any]:
+    """Build the request body for one page of /v2/get-documents."""
+    return {
+        "limit": limit,
+        "offset": offset,
+        "include_last_viewed_panel": True
+    }
+
+
+def parse_documents(data: Any) -> List[Dict]:
+    """Normalize a /v2/get-documents response to a list of documents."""
+    return data.get('docs', []) if isinstance(data, dict) else data
+
+
+def _is_not_found(exc: requests.exceptions.HTTPError) -> bool:
+    return exc.response is not None and exc.response.status_code == 404
+
+
+def _is_read_timeout(exc: requests.exceptions.ConnectionError) -> bool:
+    """Whether ``iter_content`` raised this for a read that timed out."""
+    return bool(exc.args) and isinstance(exc.args[0], ReadTimeoutError)
+
+
+def parse_transcript(data: Any) -> List[Dict]:
+    """Normalize a /v1/get-document-transcript response to utterances."""
+    return data if isinstance(data, list) else data.get('utterances', [])
 
 
 class GranolaClient:
     """Client for interacting with Granola's API."""
 
-    BASE_URL = "https://api.granola.ai"
-    CREDENTIALS_PATH = Path.home() / "Library/Application Support/Granola/supabase.json"
+    BASE_URL = BASE_URL
+    CREDENTIALS_PATH = CREDENTIALS_PATH
 
-    def __init__(self):
+    def __init__(self, policy: Optional[RequestPolicy] = None):
         self.token: Optional[str] = None
+        self.policy = policy or RequestPolicy()
         self._load_credentials()
 
     def _load_credentials(self):
         """Load access token from Granola's local storage."""
-        if not self.CREDENTIALS_PATH.exists():
-            raise FileNotFoundError(
-                f"Granola credentials not found at {self.CREDENTIALS_PATH}\n"
-                "Make sure Granola is installed and you're logged in."
-            )
-
-        with open(self.CREDENTIALS_PATH) as f:
-            data = json.load(f)
-
-        tokens = json.loads(data['workos_tokens'])
-        self.token = tokens['access_token']
+        data = load_credentials(self.CREDENTIALS_PATH)
+        self.token = access_token_from_credentials(data)
 
     def _headers(self) -> dict:
         """Build request headers."""
-        return {
-            "Authorization": f"Bearer {self.token}",
-            "Content-Type": "application/json",
-            "User-Agent": "Granola/5.354.0"
-        }
-
-    def get_documents(self, limit: int = 500) -> List[Dict]:
-        """Fetch all documents from Granola."""
-        url = f"{self.BASE_URL}/v2/get-documents"
-        all_docs = []
-        offset = 0
+        return build_headers(self.token)
 
-        while True:
-            payload = {
-                "limit": limit,
-                "offset": offset,
-                "include_last_viewed_panel": True
-            }
+    def _post(self, path: str, payload: Dict[str, Any]) -> Any:
+        """POST an idempotent read under the client's request policy."""
+        url = f"{self.BASE_URL}{path}"
 
-            resp = requests.post(url, headers=self._headers(), json=payload)
+        def send(timeout: float) -> Any:
+            resp = requests.post(url, headers=self._headers(), json=payload, timeout=timeout)
             resp.raise_for_status()
-            data = resp.json()
+            return resp.json()
 
-            docs = data.get('docs', []) if isinstance(data, dict) else data
+        return self.policy.call(send, key=path, idempotent=True)
+
+    def iter_documents(self, limit: int = 500) -> Iterator[Dict]:
+        """Yield all documents, fetching one page at a time."""
+        offset = 0
+
+        while True:
+            payload = documents_payload(limit, offset)
+            docs = parse_documents(self._post("/v2/get-documents", payload))
 
             if not docs:
                 break
 
-            all_docs.extend(docs)
+            yield from docs
 
             if len(docs) < limit:
                 break
 
             offset += limit
 
-        return all_docs
+    def get_documents(self, limit: int = 500) -> List[Dict]:
+        """Fetch all documents from Granola."""
+        return list(self.iter_documents(limit))
+
+    def get_meetings(self, limit: int = 500) -> List[Meeting]:
+        """Fetch all non-deleted documents as compact :class:`Meeting` records.
+
+        Raw documents are discarded page by page, so only one page of API
+        payloads is held at a time.
+        """
+        return [
+            Meeting.from_api(doc)
+            for doc in self.iter_documents(limit)
+            if not doc.get('deleted_at')
+        ]
 
     def get_transcript(self, document_id: str) -> Optional[List[Dict]]:
-        """Fetch transcript for a specific document."""
+        """Fetch transcript for a specific document.
+
+        Returns ``None`` if Granola has no transcript for it (404). Any other
+        failure is raised, so callers skip the document rather than treat it
+        as having no transcript; :class:`~granola_sync.latency.DeadlineExceeded`
+        means the run should stop.
+        """
+        payload = {"document_id": document_id}
+
+        try:
+            return parse_transcript(self._post("/v1/get-document-transcript", payload))
+        except requests.exceptions.HTTPError as e:
+            if _is_not_found(e):
+                return None
+            raise
+
+    def get_transcript_stream(self, document_id: str) -> Optional[Iterator[Utterance]]:
+        """Fetch a transcript, yielding :class:`Utterance` records as the response is parsed.
+
+        Unlike :meth:`get_transcript`, the body is parsed incrementally, so
+        only one utterance is held in memory at a time. The request is sent
+        before this returns: ``None`` means there is no transcript and other
+        failures are raised, as with :meth:`get_transcript`. Errors while
+        reading the body are raised by the iterator; a read that times out is counted
+        in the policy's stats and raised as ``requests.exceptions.ReadTimeout``.
+        """
         url = f"{self.BASE_URL}/v1/get-document-transcript"
         payload = {"document_id": document_id}
 
+        def send(timeout: float) -> requests.Response:
+            resp = requests.post(url, headers=self._headers(), json=payload, timeout=timeout, stream=True)
+            try:
+                resp.raise_for_status()
+            except Exception:
+                resp.close()
+                raise
+            return resp
+
         try:
-            resp = requests.post(url, headers=self._headers(), json=payload)
-            resp.raise_for_status()
-            data = resp.json()
-            return data if isinstance(data, list) else data.get('utterances', [])
-        except Exception:
-            return None
+            resp = self.policy.call(
+                send, key="/v1/get-document-transcript", idempotent=True, discard=requests.Response.close
+            )
+        except requests.exceptions.HTTPError as e:
+            if _is_not_found(e):
+                return None
+            raise
+
+        def utterances() -> Iterator[Utterance]:
+            with resp:
+                try:
+                    for utt in iter_json_items(resp.iter_content(chunk_size=1 << 16), 'utterances'):
+                        yield Utterance.from_api(utt)
+                except requests.exceptions.ConnectionError as e:
+                    if not _is_read_timeout(e):
+                        raise
+                    self.policy.stats.incr('timed_out')
+                    raise requests.exceptions.ReadTimeout(e) from e
+
+        return utterances()
 
     def get_user_info(self) -> dict:
         """Get current user info from credentials."""
-        with open(self.CREDENTIALS_PATH) as f:
-            data = json.load(f)
+        data = load_credentials(self.CREDENTIALS_PATH)
         return json.loads(data.get('user_info', '{}'))
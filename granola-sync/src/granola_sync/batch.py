@@ -0,0 +1,204 @@
+"""Upload transcripts for many Granola accounts from one host.
+
+A *profile* bundles one account's Granola credentials, its cloud config
+(the same ``config.json`` format ``granola-sync login`` writes) and a
+private ``state.json``. Profiles come either from a directory with one
+subdirectory per account::
+
+    profiles/
+      alice/
+        supabase.json    # copied from ~/Library/Application Support/Granola
+        config.json      # {"api_url": "...", "api_key": "..."}
+      bob/
+        ...
+
+or from a JSON manifest whose relative paths resolve against the manifest::
+
+    {"profiles": [
+      {"name": "alice", "credentials": "alice/supabase.json",
+       "config": "alice/config.json", "state": "alice/state.json"}
+    ]}
+
+Accounts run concurrently on one event loop with a shared connection pool;
+a failure in one account is recorded in the report and does not stop the
+others. Requires the ``async`` extra.
+"""
+import asyncio
+import json
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Optional
+
+from .aio import AsyncCloudClient, AsyncGranolaClient, create_session, upload_account
+from .cloud import CloudAPIError
+from .config import JSONStore
+
+CREDENTIALS_FILENAME = "supabase.json"
+CONFIG_FILENAME = "config.json"
+STATE_FILENAME = "state.json"
+
+
+@dataclass
+class Profile:
+    """File locations for one account."""
+
+    name: str
+    credentials_path: Path
+    config_path: Path
+    state_path: Path
+
+
+@dataclass
+class AccountResult:
+    """Outcome of one account's upload."""
+
+    name: str
+    documents: int = 0
+    uploaded: int = 0
+    updated: int = 0
+    skipped: int = 0
+    elapsed: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class BatchReport:
+    """Aggregated outcome of a batch run."""
+
+    results: List[AccountResult] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def failed(self) -> List[AccountResult]:
+        return [r for r in self.results if not r.ok]
+
+    @property
+    def documents(self) -> int:
+        return sum(r.documents for r in self.results)
+
+    @property
+    def uploaded(self) -> int:
+        return sum(r.uploaded for r in self.results)
+
+    @property
+    def updated(self) -> int:
+        return sum(r.updated for r in self.results)
+
+    @property
+    def skipped(self) -> int:
+        return sum(r.skipped for r in self.results)
+
+    @property
+    def documents_per_second(self) -> float:
+        return self.documents / self.elapsed if self.elapsed else 0.0
+
+
+def load_profiles(path: Path) -> List[Profile]:
+    """Load profiles from a profile directory or a JSON manifest."""
+    path = Path(path).expanduser()
+
+    if path.is_dir():
+        return [
+            Profile(
+                name=sub.name,
+                credentials_path=sub / CREDENTIALS_FILENAME,
+                config_path=sub / CONFIG_FILENAME,
+                state_path=sub / STATE_FILENAME,
+            )
+            for sub in sorted(path.iterdir())
+            if sub.is_dir() and (sub / CREDENTIALS_FILENAME).exists()
+        ]
+
+    with open(path) as f:
+        manifest = json.load(f)
+
+    base = path.parent
+    profiles = []
+    for entry in manifest.get('profiles', []):
+        name = entry['name']
+        # Defaults are relative to the profile's directory, not yet to ``base``.
+        profile_dir = Path(entry.get('dir', name))
+        profiles.append(Profile(
+            name=name,
+            credentials_path=base / entry.get('credentials', profile_dir / CREDENTIALS_FILENAME),
+            config_path=base / entry.get('config', profile_dir / CONFIG_FILENAME),
+            state_path=base / entry.get('state', profile_dir / STATE_FILENAME),
+        ))
+    return profiles
+
+
+def _save_last_upload(state_path: Path, result: AccountResult):
+    with JSONStore(state_path).update() as state:
+        state['last_upload'] = {
+            'finished_at': datetime.now(timezone.utc).isoformat(),
+            'documents': result.documents,
+            'uploaded': result.uploaded,
+            'updated': result.updated,
+            'skipped': result.skipped,
+            'error': result.error,
+        }
+
+
+async def _run_account(profile: Profile, session, request_limit: asyncio.Semaphore,
+                       limit: Optional[int], batch_size: int) -> AccountResult:
+    result = AccountResult(name=profile.name)
+    started = time.monotonic()
+    try:
+        cloud_config = JSONStore(profile.config_path)
+        api_url = cloud_config.get('api_url')
+        api_key = cloud_config.get('api_key')
+        # Never fall back to the host user's own login for another account.
+        if not api_url or not api_key:
+            raise CloudAPIError(f"api_url and api_key must be set in {profile.config_path}")
+
+        granola = AsyncGranolaClient(profile.credentials_path, session=session, semaphore=request_limit)
+        cloud = AsyncCloudClient(api_url, api_key, session=session, semaphore=request_limit)
+        counts = await upload_account(granola, cloud, limit=limit, batch_size=batch_size)
+        result.documents = counts['documents']
+        result.uploaded = counts['uploaded']
+        result.updated = counts['updated']
+        result.skipped = counts['skipped']
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+    result.elapsed = time.monotonic() - started
+
+    try:
+        # The locked, fsynced write would otherwise stall every other account.
+        await asyncio.to_thread(_save_last_upload, profile.state_path, result)
+    except OSError as e:
+        result.error = result.error or f"Could not save state: {e}"
+    return result
+
+
+async def run_batch(
+    profiles: List[Profile],
+    workers: int = 8,
+    max_connections: int = 32,
+    limit: Optional[int] = None,
+    batch_size: int = 50,
+) -> BatchReport:
+    """Upload every profile's transcripts concurrently.
+
+    ``workers`` caps how many accounts run at once; ``max_connections``
+    caps open connections and in-flight requests across all of them.
+    """
+    report = BatchReport()
+    account_limit = asyncio.Semaphore(workers)
+    request_limit = asyncio.Semaphore(max_connections)
+    started = time.monotonic()
+
+    async with create_session(max_connections=max_connections) as session:
+        async def run_one(profile: Profile) -> AccountResult:
+            async with account_limit:
+                return await _run_account(profile, session, request_limit, limit, batch_size)
+
+        report.results = list(await asyncio.gather(*(run_one(p) for p in profiles)))
+
+    report.elapsed = time.monotonic() - started
+    return report
@@ -1,26 +1,65 @@
-"""Command-line interface for granola-sync."""
+"""Command-line interface for granola-sync.
+
+Heavy dependencies (rich, requests and the API clients) are imported inside
+the commands that use them so trivial invocations like ``--version``,
+``logout`` or ``cloud-status`` start quickly. Keep it that way: module-level
+imports here are paid by every command.
+"""
+from functools import lru_cache
 from typing import Optional
 import click
-import getpass
 from pathlib import Path
-from rich.console import Console
-from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TaskProgressColumn
-from rich.panel import Panel
-from rich.table import Table
-from rich.prompt import Prompt
 
-from .api import GranolaClient
-from .export import export_document
-from . import config
-from .cloud import CloudClient, CloudAPIError, prepare_transcript_for_upload
-
-console = Console()
+from . import __version__, config
 
 DEFAULT_OUTPUT_DIR = Path.home() / "Granola" / "transcripts"
 
 
+@lru_cache(maxsize=None)
+def _console():
+    """Return the shared rich console, importing rich on first use."""
+    from rich.console import Console
+    return Console()
+
+
+def _progress(console):
+    """Build the progress bar used by the sync and upload commands."""
+    from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TaskProgressColumn
+    return Progress(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        BarColumn(),
+        TaskProgressColumn(),
+        console=console,
+    )
+
+
+def _request_options(command):
+    """Add timeout, deadline and hedging options to a command."""
+    command = click.option('--hedge', is_flag=True,
+                           help='Re-send slow reads after their p95 latency and use the first answer')(command)
+    command = click.option('--deadline', type=float, default=None,
+                           help='Stop starting new requests after this many seconds')(command)
+    command = click.option('--timeout', type=float, default=30.0, show_default=True,
+                           help='Per-request timeout in seconds')(command)
+    return command
+
+
+def _request_policy(timeout: float, deadline: Optional[float], hedge: bool):
+    from .latency import Deadline, RequestPolicy
+    return RequestPolicy(timeout=timeout, deadline=Deadline(deadline), hedge=hedge)
+
+
+def _add_request_rows(table, stats):
+    """Append request counters from a run's RequestStats to a summary table."""
+    table.add_row("Requests", str(stats.requests))
+    table.add_row("Hedged", f"{stats.hedged} ({stats.hedge_wins} won)")
+    table.add_row("Timed out", f"[yellow]{stats.timed_out}[/yellow]")
+    table.add_row("Abandoned", f"[yellow]{stats.abandoned}[/yellow]")
+
+
 @click.group()
-@click.version_option()
+@click.version_option(version=__version__)
 def main():
     """Sync Granola meeting transcripts to local folders or cloud."""
     pass
@@ -39,8 +78,16 @@ def main():
     default=None,
     help='Limit number of documents to sync (for testing)'
 )
-def sync(output: Path, limit: Optional[int]):
+@_request_options
+def sync(output: Path, limit: Optional[int], timeout: float, deadline: Optional[float], hedge: bool):
     """Sync all Granola transcripts to local folder."""
+    from rich.panel import Panel
+    from rich.table import Table
+    from .api import GranolaClient
+    from .export import export_document
+    from .latency import DeadlineExceeded
+
+    console = _console()
     console.print(Panel.fit(
         "[bold blue]Granola Transcript Sync[/bold blue]",
         subtitle="Exporting your meeting transcripts"
@@ -50,21 +97,19 @@ def sync(output: Path, limit: Optional[int]):
     output.mkdir(parents=True, exist_ok=True)
     console.print(f"\n[dim]Output directory:[/dim] {output}\n")
 
+    policy = _request_policy(timeout, deadline, hedge)
     try:
         # Initialize client
         with console.status("[bold green]Connecting to Granola..."):
-            client = GranolaClient()
+            client = GranolaClient(policy=policy)
             user_info = client.get_user_info()
             email = user_info.get('email', 'Unknown')
 
         console.print(f"[green]Connected as:[/green] {email}\n")
 
-        # Fetch documents
+        # Fetch documents (deleted ones are filtered out)
         with console.status("[bold green]Fetching document list..."):
-            documents = client.get_documents()
-
-        # Filter out deleted
-        documents = [d for d in documents if not d.get('deleted_at')]
+            documents = client.get_meetings()
 
         if limit:
             documents = documents[:limit]
@@ -74,24 +119,31 @@ def sync(output: Path, limit: Optional[int]):
         # Export with progress bar
         exported = 0
         skipped = 0
+        not_reached = 0
 
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            BarColumn(),
-            TaskProgressColumn(),
-            console=console,
-        ) as progress:
+        with _progress(console) as progress:
             task = progress.add_task("Exporting...", total=len(documents))
 
-            for doc in documents:
-                doc_id = doc.get('id')
-                title = doc.get('title', 'Untitled')[:40]
+            for i, doc in enumerate(documents):
+                doc_id = doc.id
+                title = doc.title[:40]
 
                 progress.update(task, description=f"[cyan]{title}...")
 
-                # Fetch transcript
-                transcript = client.get_transcript(doc_id)
+                # Fetch transcript (streamed straight into the export)
+                try:
+                    transcript = client.get_transcript_stream(doc_id)
+                except DeadlineExceeded:
+                    not_reached = len(documents) - i
+                    policy.stats.incr('abandoned', not_reached)
+                    console.print(f"[yellow]Deadline reached:[/yellow] {not_reached} documents not synced")
+                    break
+                except Exception as e:
+                    # Leave whatever was stored last run alone
+                    console.print(f"[yellow]Warning:[/yellow] Failed to fetch transcript for '{title}', skipped: {e}")
+                    skipped += 1
+                    progress.advance(task)
+                    continue
 
                 # Export
                 try:
@@ -108,6 +160,9 @@ def sync(output: Path, limit: Optional[int]):
         table = Table(title="Sync Complete", show_header=False)
         table.add_row("Exported", f"[green]{exported}[/green]")
         table.add_row("Skipped", f"[yellow]{skipped}[/yellow]")
+        if not_reached:
+            table.add_row("Not reached", f"[yellow]{not_reached}[/yellow]")
+        _add_request_rows(table, policy.stats)
         table.add_row("Location", str(output))
         console.print(table)
 
@@ -118,11 +173,17 @@ def sync(output: Path, limit: Optional[int]):
     except Exception as e:
         console.print(f"[red]Error:[/red] {e}")
         raise SystemExit(1)
+    finally:
+        policy.close()
 
 
 @main.command()
 def status():
     """Check Granola connection and show account info."""
+    from rich.table import Table
+    from .api import GranolaClient
+
+    console = _console()
     try:
         client = GranolaClient()
         user_info = client.get_user_info()
@@ -151,6 +212,9 @@ def status():
 )
 def info(output: Path):
     """Show info about synced transcripts."""
+    from rich.table import Table
+
+    console = _console()
     if not output.exists():
         console.print(f"[yellow]No transcripts found at {output}[/yellow]")
         console.print("Run [bold]granola-sync sync[/bold] first.")
@@ -182,6 +246,14 @@ def info(output: Path):
 @click.option('--email', '-e', help='Your email address')
 def login(api_url: Optional[str], email: Optional[str]):
     """Login to cloud API (register if needed)."""
+    import getpass
+    from rich.panel import Panel
+    from rich.prompt import Prompt
+    from rich.table import Table
+    from .api import GranolaClient
+    from .cloud import CloudClient, CloudAPIError
+
+    console = _console()
     console.print(Panel.fit(
         "[bold blue]Granola Cloud Login[/bold blue]",
         subtitle="Connect to your team's transcript API"
@@ -227,9 +299,10 @@ def login(api_url: Optional[str], email: Optional[str]):
             raise SystemExit(1)
 
     # Save config
-    config.set_api_url(api_url)
-    config.set_api_key(result['api_key'])
-    config.set_user_info({'email': email, 'user_id': result.get('user_id')})
+    with config.update_config() as cfg:
+        cfg['api_url'] = api_url.rstrip('/')
+        cfg['api_key'] = result['api_key']
+        cfg['user_info'] = {'email': email, 'user_id': result.get('user_id')}
 
     console.print()
     table = Table(title="Login Successful", show_header=False)
@@ -243,8 +316,17 @@ def login(api_url: Optional[str], email: Optional[str]):
 
 @main.command()
 @click.option('--limit', '-l', type=int, default=None, help='Limit number of documents')
-def upload(limit: Optional[int]):
+@click.option('--full', is_flag=True, help='Re-upload complete transcripts instead of only new utterances')
+@_request_options
+def upload(limit: Optional[int], full: bool, timeout: float, deadline: Optional[float], hedge: bool):
     """Upload transcripts from Granola to cloud."""
+    from rich.panel import Panel
+    from rich.table import Table
+    from .api import GranolaClient
+    from .cloud import CloudClient, CloudAPIError, plan_upload
+    from .latency import DeadlineExceeded
+
+    console = _console()
     console.print(Panel.fit(
         "[bold blue]Granola Cloud Upload[/bold blue]",
         subtitle="Syncing your transcripts to the cloud"
@@ -255,11 +337,15 @@ def upload(limit: Optional[int]):
         console.print("[red]Not logged in.[/red] Run 'granola-sync login' first.")
         raise SystemExit(1)
 
+    policy = _request_policy(timeout, deadline, hedge)
+    # The deadline stops fetching from Granola; what was prepared by then is
+    # still uploaded, each request bounded by --timeout.
+    upload_policy = policy.without_deadline()
     try:
         # Initialize clients
         with console.status("[bold green]Connecting..."):
-            granola = GranolaClient()
-            cloud = CloudClient()
+            granola = GranolaClient(policy=policy)
+            cloud = CloudClient(policy=upload_policy)
             user_info = granola.get_user_info()
             email = user_info.get('email', 'Unknown')
 
@@ -268,71 +354,128 @@ def upload(limit: Optional[int]):
 
         # Fetch documents from Granola
         with console.status("[bold green]Fetching documents from Granola..."):
-            documents = granola.get_documents()
+            documents = granola.get_meetings()
 
-        documents = [d for d in documents if not d.get('deleted_at')]
         if limit:
             documents = documents[:limit]
 
         console.print(f"[green]Found {len(documents)} documents[/green]\n")
 
-        # Prepare and upload
-        transcripts_to_upload = []
+        # Compare against what the last run uploaded to this account
+        previous_uploads = {} if full else config.load_upload_state()
+
+        # Prepare uploads
+        full_uploads = []
+        appends = []
+        unchanged = 0
+        skipped = 0
+        not_reached = 0
 
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            BarColumn(),
-            TaskProgressColumn(),
-            console=console,
-        ) as progress:
+        with _progress(console) as progress:
             task = progress.add_task("Preparing...", total=len(documents))
 
-            for doc in documents:
-                doc_id = doc.get('id')
-                title = doc.get('title', 'Untitled')[:40]
+            for i, doc in enumerate(documents):
+                doc_id = doc.id
+                title = doc.title[:40]
                 progress.update(task, description=f"[cyan]{title}...")
 
                 # Fetch transcript
-                transcript = granola.get_transcript(doc_id)
+                try:
+                    transcript = granola.get_transcript_stream(doc_id)
+                except DeadlineExceeded:
+                    not_reached = len(documents) - i
+                    policy.stats.incr('abandoned', not_reached)
+                    console.print(f"[yellow]Deadline reached:[/yellow] {not_reached} documents not prepared")
+                    break
+                except Exception as e:
+                    # Leave whatever was stored last run alone
+                    console.print(f"[yellow]Warning:[/yellow] Failed to fetch transcript for '{title}', skipped: {e}")
+                    skipped += 1
+                    progress.advance(task)
+                    continue
 
-                # Prepare for upload
-                prepared = prepare_transcript_for_upload(doc, transcript)
-                transcripts_to_upload.append(prepared)
+                # Send only what changed since the last upload
+                try:
+                    plan = plan_upload(doc, transcript, previous_uploads.get(doc_id))
+                except Exception as e:
+                    console.print(f"[yellow]Warning:[/yellow] Failed to read transcript for '{title}': {e}")
+                    skipped += 1
+                    progress.advance(task)
+                    continue
+
+                if plan.unchanged:
+                    unchanged += 1
+                elif plan.delta:
+                    appends.append(plan)
+                else:
+                    full_uploads.append(plan)
 
                 progress.advance(task)
 
-        # Upload in batches
-        console.print("\n[bold]Uploading to cloud...[/bold]")
         batch_size = 50
         total_uploaded = 0
         total_updated = 0
+        total_appended = 0
+        uploaded_state = {}
 
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            BarColumn(),
-            TaskProgressColumn(),
-            console=console,
-        ) as progress:
-            task = progress.add_task("Uploading...", total=len(transcripts_to_upload))
-
-            for i in range(0, len(transcripts_to_upload), batch_size):
-                batch = transcripts_to_upload[i:i + batch_size]
-                progress.update(task, description=f"[cyan]Batch {i // batch_size + 1}...")
-
-                result = cloud.upload_transcripts(batch)
-                total_uploaded += result.get('uploaded', 0)
-                total_updated += result.get('updated', 0)
-
-                progress.advance(task, len(batch))
+        try:
+            # Append new utterances to transcripts the cloud already has
+            if appends:
+                with console.status(f"[bold green]Appending to {len(appends)} transcripts..."):
+                    for i in range(0, len(appends), batch_size):
+                        batch = appends[i:i + batch_size]
+                        try:
+                            result = cloud.append_transcripts([p.delta for p in batch])
+                        except CloudAPIError as e:
+                            if e.status != 404:
+                                raise
+                            console.print("[dim]Server does not support delta uploads; "
+                                          "sending full transcripts.[/dim]")
+                            full_uploads.extend(appends[i:])
+                            break
+
+                        total_appended += result.get('appended', 0)
+                        rejected = set(result.get('rejected', []))
+                        for p in batch:
+                            if p.full['id'] in rejected:
+                                full_uploads.append(p)
+                            else:
+                                uploaded_state[p.full['id']] = p.state
+
+            # Upload in batches
+            console.print("\n[bold]Uploading to cloud...[/bold]")
+
+            with _progress(console) as progress:
+                task = progress.add_task("Uploading...", total=len(full_uploads))
+
+                for i in range(0, len(full_uploads), batch_size):
+                    batch = full_uploads[i:i + batch_size]
+                    progress.update(task, description=f"[cyan]Batch {i // batch_size + 1}...")
+
+                    result = cloud.upload_transcripts([p.full for p in batch])
+                    total_uploaded += result.get('uploaded', 0)
+                    total_updated += result.get('updated', 0)
+                    for p in batch:
+                        uploaded_state[p.full['id']] = p.state
+
+                    progress.advance(task, len(batch))
+        finally:
+            if uploaded_state:
+                config.save_upload_state(uploaded_state)
 
         # Summary
         console.print()
         table = Table(title="Upload Complete", show_header=False)
         table.add_row("New", f"[green]{total_uploaded}[/green]")
         table.add_row("Updated", f"[yellow]{total_updated}[/yellow]")
-        table.add_row("Total in cloud", f"[blue]{total_uploaded + total_updated}[/blue]")
+        table.add_row("Appended", f"[yellow]{total_appended}[/yellow]")
+        table.add_row("Unchanged", f"[dim]{unchanged}[/dim]")
+        if skipped:
+            table.add_row("Skipped", f"[yellow]{skipped}[/yellow]")
+        table.add_row("Total in cloud", f"[blue]{total_uploaded + total_updated + total_appended + unchanged}[/blue]")
+        if not_reached:
+            table.add_row("Not reached", f"[yellow]{not_reached}[/yellow]")
+        _add_request_rows(table, policy.stats)
         console.print(table)
 
     except FileNotFoundError as e:
@@ -345,11 +488,80 @@ def upload(limit: Optional[int]):
     except Exception as e:
         console.print(f"[red]Error:[/red] {e}")
         raise SystemExit(1)
+    finally:
+        policy.close()
+        upload_policy.close()
+
+
+@main.command('batch-upload')
+@click.argument('profiles', type=click.Path(exists=True, path_type=Path))
+@click.option('--workers', '-w', type=int, default=8, show_default=True,
+              help='Accounts to sync at the same time')
+@click.option('--max-connections', '-c', type=int, default=32, show_default=True,
+              help='Open connections shared by all accounts')
+@click.option('--limit', '-l', type=int, default=None, help='Limit number of documents per account')
+def batch_upload(profiles: Path, workers: int, max_connections: int, limit: Optional[int]):
+    """Upload transcripts for every account in a profile directory or manifest."""
+    import asyncio
+    from rich.panel import Panel
+    from rich.table import Table
+
+    console = _console()
+    try:
+        from .batch import load_profiles, run_batch
+    except ImportError:
+        console.print("[red]Error:[/red] batch-upload needs the async extra: "
+                      "pip install 'granola-sync[async]'")
+        raise SystemExit(1)
+
+    console.print(Panel.fit(
+        "[bold blue]Granola Batch Upload[/bold blue]",
+        subtitle="Syncing transcripts for multiple accounts"
+    ))
+
+    accounts = load_profiles(profiles)
+    if not accounts:
+        console.print(f"[yellow]No profiles found in {profiles}[/yellow]")
+        raise SystemExit(1)
+
+    with console.status(f"[bold green]Uploading {len(accounts)} accounts..."):
+        report = asyncio.run(run_batch(accounts, workers=workers, max_connections=max_connections, limit=limit))
+
+    table = Table(title="Accounts")
+    table.add_column("Account", style="cyan")
+    table.add_column("Documents", justify="right")
+    table.add_column("New", justify="right")
+    table.add_column("Updated", justify="right")
+    table.add_column("Time", justify="right")
+    table.add_column("Status")
+    for result in report.results:
+        status = "[green]OK[/green]" if result.ok else f"[red]{result.error}[/red]"
+        table.add_row(result.name, str(result.documents), str(result.uploaded),
+                      str(result.updated), f"{result.elapsed:.1f}s", status)
+    console.print(table)
+
+    summary = Table(title="Batch Complete", show_header=False)
+    summary.add_row("Accounts", f"[green]{len(report.results) - len(report.failed)}[/green] ok, "
+                                f"[red]{len(report.failed)}[/red] failed")
+    summary.add_row("Documents", str(report.documents))
+    summary.add_row("New", f"[green]{report.uploaded}[/green]")
+    summary.add_row("Updated", f"[yellow]{report.updated}[/yellow]")
+    if report.skipped:
+        summary.add_row("Skipped", f"[yellow]{report.skipped}[/yellow]")
+    summary.add_row("Elapsed", f"{report.elapsed:.1f}s")
+    summary.add_row("Throughput", f"{report.documents_per_second:.1f} documents/s")
+    console.print(summary)
+
+    if report.failed:
+        raise SystemExit(1)
 
 
 @main.command('cloud-status')
 def cloud_status():
     """Check cloud connection status."""
+    from rich.table import Table
+
+    console = _console()
     table = Table(title="Cloud Status")
     table.add_column("Property", style="cyan")
     table.add_column("Value", style="green")
@@ -369,6 +581,7 @@ def cloud_status():
     # Try to get stats from API
     if api_url and api_key:
         try:
+            from .cloud import CloudClient
             cloud = CloudClient()
             stats = cloud.get_stats()
             table.add_row("Transcripts in cloud", str(stats.get('totalTranscripts', 0)))
@@ -380,11 +593,37 @@ def cloud_status():
     console.print(table)
 
 
+@main.command()
+@click.option('--db', type=click.Path(path_type=Path), default=config.CONFIG_DIR / "server.db",
+              show_default=True, help='SQLite database file')
+@click.option('--host', default='127.0.0.1', show_default=True, help='Interface to listen on')
+@click.option('--port', '-p', type=int, default=8787, show_default=True, help='Port to listen on')
+@click.option('--quiet', '-q', is_flag=True, help='Do not log each request')
+def serve(db: Path, host: str, port: int, quiet: bool):
+    """Run a self-hosted cloud API backed by SQLite."""
+    from .server import create_server
+
+    console = _console()
+    db.parent.mkdir(parents=True, exist_ok=True)
+    server = create_server(db, host, port, quiet=quiet)
+
+    console.print(f"[green]Serving cloud API on[/green] http://{host}:{port}")
+    console.print(f"[dim]Database:[/dim] {db}")
+    console.print(f"\n[dim]Log in with:[/dim] granola-sync login --api-url http://{host}:{port}\n")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        console.print("\n[dim]Stopped.[/dim]")
+    finally:
+        server.server_close()
+
+
 @main.command()
 def logout():
     """Clear cloud credentials."""
     config.clear_config()
-    console.print("[green]Logged out.[/green] Cloud credentials cleared.")
+    _console().print("[green]Logged out.[/green] Cloud credentials cleared.")
 
 
 if __name__ == "__main__":
@@ -1,22 +1,49 @@
 """Cloud API client for granola-sync."""
+import hashlib
+import io
+import json
 import requests
-from typing import Optional, List, Dict, Any
+from dataclasses import dataclass
+from typing import Optional, Iterable, List, Dict, Any, Tuple, Union
 from datetime import datetime
 
 from .config import get_api_url, get_api_key
+from .latency import DEFAULT_TIMEOUT, RequestPolicy
+from .models import Meeting, Utterance, as_meeting, as_utterance
 
 
 class CloudAPIError(Exception):
     """Error from the cloud API."""
-    pass
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+def cloud_headers(api_key: str) -> Dict[str, str]:
+    """Build request headers for the cloud API."""
+    return {
+        "Content-Type": "application/json",
+        "X-API-Key": api_key,
+    }
+
+
+def error_message(body: str) -> str:
+    """Extract the ``error`` field from an error response body."""
+    try:
+        return json.loads(body).get('error', body)
+    except Exception:
+        return body
 
 
 class CloudClient:
     """Client for interacting with the Granola cloud API."""
 
-    def __init__(self, api_url: Optional[str] = None, api_key: Optional[str] = None):
+    def __init__(self, api_url: Optional[str] = None, api_key: Optional[str] = None,
+                 policy: Optional[RequestPolicy] = None):
         self.api_url = api_url or get_api_url()
         self.api_key = api_key or get_api_key()
+        self.policy = policy or RequestPolicy()
 
         if not self.api_url:
             raise CloudAPIError("API URL not configured. Run 'granola-sync login' first.")
@@ -25,24 +52,23 @@ class CloudClient:
 
     def _headers(self) -> Dict[str, str]:
         """Build request headers."""
-        return {
-            "Content-Type": "application/json",
-            "X-API-Key": self.api_key,
-        }
+        return cloud_headers(self.api_key)
 
     def _request(self, method: str, path: str, **kwargs) -> Dict[str, Any]:
-        """Make an API request."""
+        """Make an API request.
+
+        GET requests are reads and may be hedged by the request policy.
+        """
         url = f"{self.api_url}{path}"
-        resp = requests.request(method, url, headers=self._headers(), **kwargs)
 
-        if resp.status_code >= 400:
-            try:
-                error = resp.json().get('error', resp.text)
-            except Exception:
-                error = resp.text
-            raise CloudAPIError(f"API error ({resp.status_code}): {error}")
+        def send(timeout: float) -> Dict[str, Any]:
+            resp = requests.request(method, url, headers=self._headers(), timeout=timeout, **kwargs)
+            if resp.status_code >= 400:
+                raise CloudAPIError(f"API error ({resp.status_code}): {error_message(resp.text)}",
+                                    resp.status_code)
+            return resp.json()
 
-        return resp.json()
+        return self.policy.call(send, key=path.split('?')[0], idempotent=method == "GET")
 
     @staticmethod
     def register(api_url: str, email: str, password: str, name: Optional[str] = None) -> Dict[str, Any]:
@@ -52,14 +78,12 @@ class CloudClient:
         if name:
             payload["name"] = name
 
-        resp = requests.post(url, json=payload, headers={"Content-Type": "application/json"})
+        resp = requests.post(url, json=payload, headers={"Content-Type": "application/json"},
+                             timeout=DEFAULT_TIMEOUT)
 
         if resp.status_code >= 400:
-            try:
-                error = resp.json().get('error', resp.text)
-            except Exception:
-                error = resp.text
-            raise CloudAPIError(f"Registration failed ({resp.status_code}): {error}")
+            raise CloudAPIError(f"Registration failed ({resp.status_code}): {error_message(resp.text)}",
+                                resp.status_code)
 
         return resp.json()
 
@@ -67,6 +91,15 @@ class CloudClient:
         """Upload transcripts to the cloud."""
         return self._request("POST", "/api/upload", json={"transcripts": transcripts})
 
+    def append_transcripts(self, appends: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Append utterances to transcripts already in the cloud.
+
+        Each item comes from :func:`plan_upload`. The response lists the ids
+        whose ``base_hash`` no longer matched in ``rejected``; those need a
+        full upload. Servers without delta support answer 404.
+        """
+        return self._request("POST", "/api/append", json={"appends": appends})
+
     def list_transcripts(self, limit: int = 50, offset: int = 0) -> Dict[str, Any]:
         """List transcripts in the cloud."""
         return self._request("GET", f"/api/transcripts?limit={limit}&offset={offset}")
@@ -80,10 +113,15 @@ class CloudClient:
         return self._request("GET", "/api/stats")
 
 
-def prepare_transcript_for_upload(doc: Dict, transcript: Optional[List[Dict]]) -> Dict[str, Any]:
-    """Prepare a document and transcript for upload to the cloud."""
+def prepare_transcript_for_upload(
+    doc: Union[Meeting, Dict],
+    transcript: Optional[Iterable[Union[Utterance, Dict]]],
+) -> Dict[str, Any]:
+    """Prepare a document (a :class:`Meeting` or raw dict) and transcript for upload to the cloud."""
+    meeting = as_meeting(doc)
+
     # Extract date
-    created_at = doc.get('created_at', '')
+    created_at = meeting.created_at
     date_str = ''
     if created_at:
         try:
@@ -92,61 +130,111 @@ def prepare_transcript_for_upload(doc: Dict, transcript: Optional[List[Dict]]) -
         except Exception:
             date_str = created_at[:10] if len(created_at) >= 10 else ''
 
-    # Extract attendees
-    people = doc.get('people', [])
-    attendees = []
-    if people:
-        attendees = [
-            p.get('name', p.get('email', 'Unknown'))
-            for p in people
-            if isinstance(p, dict)
-        ]
-
     # Format transcript text
-    transcript_text = ''
-    if transcript:
-        lines = []
-        for utt in transcript:
-            speaker = utt.get('speaker', 'Unknown')
-            text = utt.get('text', '')
-            lines.append(f"{speaker}: {text}")
-        transcript_text = '\n'.join(lines)
-
-    # Extract notes
-    notes = doc.get('notes_plain', '') or doc.get('notes_markdown', '')
-    if not notes and doc.get('notes'):
-        # Try to extract from ProseMirror structure
-        notes = _extract_notes_text(doc.get('notes'))
+    transcript_text = '\n'.join(format_transcript_line(utt) for utt in transcript or ())
 
     return {
-        "id": doc.get('id'),
-        "title": doc.get('title', 'Untitled Meeting'),
+        "id": meeting.id,
+        "title": meeting.title,
         "date": date_str,
         "created_at": created_at,
-        "attendees": attendees,
-        "summary": doc.get('summary', ''),
-        "notes": notes,
+        "attendees": list(meeting.attendees),
+        "summary": meeting.summary,
+        "notes": meeting.notes,
         "transcript": transcript_text,
     }
 
 
-def _extract_notes_text(notes) -> str:
-    """Extract plain text from ProseMirror notes structure."""
-    if not notes:
-        return ""
-    if isinstance(notes, str):
-        return notes
-
-    def extract_text(node):
-        if isinstance(node, str):
-            return node
-        if isinstance(node, dict):
-            if 'text' in node:
-                return node['text']
-            if 'content' in node:
-                return ''.join(extract_text(c) for c in node['content'])
-        if isinstance(node, list):
-            return ''.join(extract_text(n) for n in node)
-        return ''
-
-    return extract_text(notes)
+def format_transcript_line(utt: Union[Utterance, Dict]) -> str:
+    """Format one utterance as a ``Speaker: text`` line of an uploaded transcript."""
+    utt = as_utterance(utt)
+    return f"{utt.speaker}: {utt.text}"
+
+
+@dataclass
+class UploadPlan:
+    """What to send for one meeting, given what was uploaded last time.
+
+    ``full`` is always the complete record. ``delta`` is set when only
+    utterances were appended (or only metadata changed) since the last
+    upload, and carries just the new lines. ``state`` is what to remember
+    once the upload succeeds.
+    """
+
+    full: Dict[str, Any]
+    state: Dict[str, Any]
+    delta: Optional[Dict[str, Any]] = None
+    unchanged: bool = False
+
+
+def _join_and_hash(transcript: Optional[Iterable[Union[Utterance, Dict]]], prefix_len: int) -> Tuple[str, int, Optional[str], int, str]:
+    """Format and hash a transcript in one pass over its utterances.
+
+    Returns the joined text, the number of lines, the SHA-256 of the first
+    ``prefix_len`` lines (``None`` if there are fewer), the offset in the
+    text where line ``prefix_len`` starts, and the SHA-256 of all of it.
+    Lines are hashed as they are uploaded, joined with newlines, so the
+    server can check a base hash against its stored text.
+    """
+    out = io.StringIO()
+    digest = hashlib.sha256()
+    prefix_hash = None
+    prefix_end = 0
+    count = 0
+    for utt in transcript or ():
+        line = format_transcript_line(utt)
+        if count == prefix_len:
+            prefix_hash = digest.hexdigest()
+            prefix_end = out.tell() + (1 if count else 0)
+        if count:
+            out.write('\n')
+            digest.update(b'\n')
+        out.write(line)
+        digest.update(line.encode('utf-8'))
+        count += 1
+
+    text = out.getvalue()
+    full_hash = digest.hexdigest()
+    if count == prefix_len:
+        prefix_hash, prefix_end = full_hash, len(text)
+    return text, count, prefix_hash, prefix_end, full_hash
+
+
+def plan_upload(
+    doc: Union[Meeting, Dict],
+    transcript: Optional[Iterable[Union[Utterance, Dict]]],
+    previous: Optional[Dict[str, Any]],
+) -> UploadPlan:
+    """Decide between skipping, appending to, or fully re-uploading a meeting.
+
+    ``previous`` is the ``state`` of the last successful upload. A delta is
+    only planned when the previously uploaded utterances are unchanged;
+    any edit to earlier content falls back to a full upload. ``transcript``
+    may be an iterator (see :meth:`GranolaClient.get_transcript_stream`);
+    it is consumed once and no utterance is kept after it is formatted.
+    """
+    base = previous.get('utterances', 0) if previous else 0
+    text, count, prefix_hash, prefix_end, full_hash = _join_and_hash(transcript, base)
+
+    full = prepare_transcript_for_upload(doc, None)
+    full['transcript'] = text
+
+    metadata = {k: v for k, v in full.items() if k != 'transcript'}
+    meta_hash = hashlib.sha256(json.dumps(metadata, sort_keys=True).encode('utf-8')).hexdigest()
+
+    plan = UploadPlan(full=full, state={'utterances': count, 'hash': full_hash, 'meta': meta_hash})
+
+    if not previous or base == 0 or prefix_hash != previous.get('hash'):
+        return plan
+
+    if base == count and meta_hash == previous.get('meta'):
+        plan.unchanged = True
+        return plan
+
+    plan.delta = dict(
+        metadata,
+        transcript=text[prefix_end:],
+        base_hash=previous['hash'],
+        base_utterances=base,
+    )
+    return plan
@@ -1,10 +1,143 @@
 """Configuration management for granola-sync."""
+import hashlib
 import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, ContextManager, Iterator, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows has no fcntl
+    fcntl = None
 
 CONFIG_DIR = Path.home() / ".granola-sync"
 CONFIG_FILE = CONFIG_DIR / "config.json"
+STATE_FILE = CONFIG_DIR / "state.json"
+
+
+class JSONStore:
+    """A JSON file cached in memory and shared safely between processes.
+
+    Reads are served from an in-process cache that is invalidated when the
+    file's mtime, size or inode changes, so repeated getters cost one
+    ``stat`` instead of a parse. Writes go through :meth:`update`, which
+    holds an advisory lock on a sidecar ``.lock`` file, re-reads the latest
+    contents, and replaces the file atomically once the block exits.
+
+    Values returned by :meth:`get` and :meth:`load` share structure with the
+    cache; treat them as read-only and make changes inside :meth:`update`.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.lock_path = self.path.with_name(self.path.name + ".lock")
+        self._data: Dict[str, Any] = {}
+        self._signature: Optional[Tuple[int, int, int]] = None
+        self._mutex = threading.RLock()
+        self._pending: Optional[Dict[str, Any]] = None
+
+    def _stat_signature(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            st = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def _refresh(self) -> Dict[str, Any]:
+        """Return cached contents, re-reading the file if it changed."""
+        signature = self._stat_signature()
+        if signature is None:
+            self._data, self._signature = {}, None
+        elif signature != self._signature:
+            try:
+                with open(self.path) as f:
+                    self._data = json.load(f)
+            except FileNotFoundError:
+                self._data, self._signature = {}, None
+            else:
+                self._signature = signature
+        return self._data
+
+    def load(self) -> Dict[str, Any]:
+        """Return a shallow copy of the stored data."""
+        with self._mutex:
+            return dict(self._refresh())
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return a single value."""
+        with self._mutex:
+            return self._refresh().get(key, default)
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Hold the in-process mutex and the cross-process file lock."""
+        with self._mutex:
+            if self._pending is not None or fcntl is None:
+                # Already locked by an enclosing update() in this thread.
+                yield
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.lock_path, "a") as lock_file:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    @contextmanager
+    def update(self) -> Iterator[Dict[str, Any]]:
+        """Modify the stored data and write it back once, atomically.
+
+        Nested calls share the outermost dict and are written together.
+        Nothing is written if the block raises.
+        """
+        with self._locked():
+            if self._pending is not None:
+                yield self._pending
+                return
+
+            self._pending = dict(self._refresh())
+            try:
+                yield self._pending
+                self._write(self._pending)
+            finally:
+                self._pending = None
+
+    def save(self, data: Dict[str, Any]):
+        """Replace the stored data."""
+        with self.update() as current:
+            current.clear()
+            current.update(data)
+
+    def clear(self):
+        """Delete the file."""
+        with self._locked():
+            if self.path.exists():
+                self.path.unlink()
+            self._data, self._signature = {}, None
+
+    def _write(self, data: Dict[str, Any]):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, prefix=self.path.name, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(data, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        self._data = dict(data)
+        self._signature = self._stat_signature()
+
+
+_config_store = JSONStore(CONFIG_FILE)
+_state_store = JSONStore(STATE_FILE)
 
 
 def ensure_config_dir():
@@ -14,57 +147,57 @@ def ensure_config_dir():
 
 def load_config() -> Dict[str, Any]:
     """Load configuration from file."""
-    if not CONFIG_FILE.exists():
-        return {}
-
-    with open(CONFIG_FILE) as f:
-        return json.load(f)
+    return _config_store.load()
 
 
 def save_config(config: Dict[str, Any]):
     """Save configuration to file."""
-    ensure_config_dir()
-    with open(CONFIG_FILE, 'w') as f:
-        json.dump(config, f, indent=2)
+    _config_store.save(config)
+
+
+def update_config() -> ContextManager[Dict[str, Any]]:
+    """Batch several configuration changes into one locked, atomic write.
+
+    Example::
+
+        with update_config() as cfg:
+            cfg['api_url'] = url
+            cfg['api_key'] = key
+    """
+    return _config_store.update()
 
 
 def get_api_url() -> Optional[str]:
     """Get the configured API URL."""
-    config = load_config()
-    return config.get('api_url')
+    return _config_store.get('api_url')
 
 
 def set_api_url(url: str):
     """Set the API URL."""
-    config = load_config()
-    config['api_url'] = url.rstrip('/')
-    save_config(config)
+    with update_config() as config:
+        config['api_url'] = url.rstrip('/')
 
 
 def get_api_key() -> Optional[str]:
     """Get the configured API key."""
-    config = load_config()
-    return config.get('api_key')
+    return _config_store.get('api_key')
 
 
 def set_api_key(key: str):
     """Set the API key."""
-    config = load_config()
-    config['api_key'] = key
-    save_config(config)
+    with update_config() as config:
+        config['api_key'] = key
 
 
 def get_user_info() -> Optional[Dict[str, Any]]:
     """Get stored user info from cloud login."""
-    config = load_config()
-    return config.get('user_info')
+    return _config_store.get('user_info')
 
 
 def set_user_info(info: Dict[str, Any]):
     """Store user info from cloud login."""
-    config = load_config()
-    config['user_info'] = info
-    save_config(config)
+    with update_config() as config:
+        config['user_info'] = info
 
 
 def is_logged_in() -> bool:
@@ -74,5 +207,40 @@ def is_logged_in() -> bool:
 
 def clear_config():
     """Clear all configuration."""
-    if CONFIG_FILE.exists():
-        CONFIG_FILE.unlink()
+    _config_store.clear()
+
+
+def load_state() -> Dict[str, Any]:
+    """Load sync state (kept separate from config so logout preserves it)."""
+    return _state_store.load()
+
+
+def update_state() -> ContextManager[Dict[str, Any]]:
+    """Batch several sync state changes into one locked, atomic write."""
+    return _state_store.update()
+
+
+def upload_state_key(api_url: str, api_key: str) -> str:
+    """Key for one cloud account's upload state.
+
+    Includes a hash of the API key, so logging in as another user, or to a
+    fresh server at the same URL, does not reuse what the last account
+    uploaded.
+    """
+    digest = hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:16]
+    return f"{api_url.rstrip('/')}#{digest}"
+
+
+def load_upload_state() -> Dict[str, Any]:
+    """What the last uploads sent to the logged-in cloud account, by document id."""
+    key = upload_state_key(get_api_url() or '', get_api_key() or '')
+    return load_state().get('uploads', {}).get(key, {})
+
+
+def save_upload_state(uploaded: Dict[str, Any]):
+    """Merge newly uploaded documents into the logged-in account's upload state."""
+    key = upload_state_key(get_api_url() or '', get_api_key() or '')
+    with update_state() as state:
+        uploads = dict(state.get('uploads', {}))
+        uploads[key] = {**uploads.get(key, {}), **uploaded}
+        state['uploads'] = uploads
@@ -1,8 +1,12 @@
 """Export Granola documents to markdown files."""
+import os
 import re
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, List, Dict
+from typing import Optional, Iterable, List, Dict, Union
+
+from .models import Meeting, Utterance, as_meeting, as_utterance
+from .models import extract_notes_text  # noqa: F401 - re-exported for existing callers
 
 
 def sanitize_filename(name: str) -> str:
@@ -12,69 +16,51 @@ def sanitize_filename(name: str) -> str:
     return name[:100]
 
 
-def format_transcript(utterances: List[Dict]) -> str:
-    """Format transcript utterances into readable text."""
-    if not utterances:
-        return ""
-
-    lines = []
-    for utt in utterances:
-        speaker = utt.get('speaker', 'Unknown')
-        text = utt.get('text', '')
-        timestamp = utt.get('start_timestamp', '')
-
-        if timestamp:
-            try:
-                dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-                time_str = dt.strftime('%H:%M:%S')
-                lines.append(f"**[{time_str}] {speaker}:** {text}")
-            except Exception:
-                lines.append(f"**{speaker}:** {text}")
-        else:
-            lines.append(f"**{speaker}:** {text}")
+def format_utterance(utt: Union[Utterance, Dict]) -> str:
+    """Format one transcript utterance as a markdown line."""
+    utt = as_utterance(utt)
+    speaker = utt.speaker
+    text = utt.text
+    timestamp = utt.start_timestamp
 
-    return "\n\n".join(lines)
+    if timestamp:
+        try:
+            dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+            time_str = dt.strftime('%H:%M:%S')
+            return f"**[{time_str}] {speaker}:** {text}"
+        except Exception:
+            pass
+    return f"**{speaker}:** {text}"
 
 
-def extract_notes_text(notes) -> str:
-    """Extract plain text from ProseMirror notes structure."""
-    if not notes:
+def format_transcript(utterances: List[Union[Utterance, Dict]]) -> str:
+    """Format transcript utterances into readable text."""
+    if not utterances:
         return ""
 
-    if isinstance(notes, str):
-        return notes
-
-    def extract_text(node):
-        if isinstance(node, str):
-            return node
-        if isinstance(node, dict):
-            if 'text' in node:
-                return node['text']
-            if 'content' in node:
-                return ''.join(extract_text(c) for c in node['content'])
-        if isinstance(node, list):
-            return ''.join(extract_text(n) for n in node)
-        return ''
-
-    return extract_text(notes)
+    return "\n\n".join(format_utterance(utt) for utt in utterances)
 
 
 def export_document(
-    doc: Dict,
-    transcript: Optional[List[Dict]],
+    doc: Union[Meeting, Dict],
+    transcript: Optional[Union[Iterable[Union[Utterance, Dict]], Dict]],
     output_dir: Path
 ) -> Path:
-    """Export a single document with its transcript to markdown."""
-    doc_id = doc.get('id', 'unknown')
-    title = doc.get('title', 'Untitled Meeting')
-    created_at = doc.get('created_at', '')
-    summary = doc.get('summary', '')
-    notes = (
-        doc.get('notes_plain', '') or
-        doc.get('notes_markdown', '') or
-        extract_notes_text(doc.get('notes', ''))
-    )
-    people = doc.get('people', [])
+    """Export a single document with its transcript to markdown.
+
+    ``doc`` may be a :class:`Meeting` or a raw API document. ``transcript``
+    may be a list of utterances or an iterator such as
+    :meth:`GranolaClient.get_transcript_stream` returns; utterances are
+    written as they are consumed. The file is written to a temporary name
+    and moved into place, so a failure mid-stream leaves no partial export.
+    """
+    meeting = as_meeting(doc)
+    doc_id = meeting.id if meeting.id is not None else 'unknown'
+    title = meeting.title
+    created_at = meeting.created_at
+    summary = meeting.summary
+    notes = meeting.notes
+    attendees = meeting.attendees
 
     # Parse date for filename
     date_str = ''
@@ -97,14 +83,8 @@ def export_document(
     content.append(f"**Date:** {created_at}")
     content.append(f"**Document ID:** {doc_id}")
 
-    if people:
-        attendees = [
-            p.get('name', p.get('email', 'Unknown'))
-            for p in people
-            if isinstance(p, dict)
-        ]
-        if attendees:
-            content.append(f"**Attendees:** {', '.join(attendees)}")
+    if attendees:
+        content.append(f"**Attendees:** {', '.join(attendees)}")
 
     content.append("")
     content.append("---")
@@ -122,16 +102,28 @@ def export_document(
         content.append(notes)
         content.append("")
 
+    utterances = iter(())
     if transcript:
-        utterances = transcript if isinstance(transcript, list) else transcript.get('utterances', [])
-        if utterances:
-            content.append("## Transcript")
-            content.append("")
-            content.append(format_transcript(utterances))
-            content.append("")
+        utterances = iter(transcript.get('utterances', []) if isinstance(transcript, dict) else transcript)
 
     # Write file
-    with open(filepath, 'w', encoding='utf-8') as f:
-        f.write('\n'.join(content))
+    tmp_path = filepath.with_name(filepath.name + '.tmp')
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(content))
+
+            first = next(utterances, None)
+            if first is not None:
+                f.write("\n## Transcript\n\n")
+                f.write(format_utterance(first))
+                for utt in utterances:
+                    f.write("\n\n")
+                    f.write(format_utterance(utt))
+                f.write("\n")
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        if tmp_path.exists():
+            tmp_path.unlink()
+        raise
 
     return filepath
@@ -0,0 +1,230 @@
+"""Timeouts, run deadlines and hedged requests for the API clients.
+
+A :class:`RequestPolicy` is shared by the clients taking part in one run.
+Every request gets a timeout capped by the time left before the run's
+:class:`Deadline`. Idempotent reads can optionally be *hedged*: if the
+first attempt hasn't answered after the endpoint's observed p95 latency, a
+duplicate is sent and whichever answers first wins. Counters for the run
+summary are kept in :class:`RequestStats`.
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from functools import partial
+from typing import Callable, Deque, Dict, Optional, TypeVar
+
+import requests
+
+T = TypeVar('T')
+
+DEFAULT_TIMEOUT = 30.0
+# Hedge delay used until an endpoint has enough samples for a p95.
+DEFAULT_HEDGE_AFTER = 2.0
+MIN_HEDGE_SAMPLES = 20
+LATENCY_WINDOW = 256
+
+
+class DeadlineExceeded(Exception):
+    """The run deadline passed before a request could be made."""
+    pass
+
+
+class Deadline:
+    """A point in time after which no new requests are started."""
+
+    def __init__(self, seconds: Optional[float] = None):
+        self.expires_at = time.monotonic() + seconds if seconds else None
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left, or ``None`` if there is no deadline."""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() == 0.0
+
+
+class RequestStats:
+    """Thread-safe request counters and per-endpoint latency samples.
+
+    ``abandoned`` counts requests given up on: hedged attempts still in
+    flight when the other attempt won, and requests never sent because the
+    run deadline passed (the caller knows how many it skipped and adds
+    them). ``timed_out`` only counts requests whose answer was still wanted.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latencies: Dict[str, Deque[float]] = {}
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.timed_out = 0
+        self.abandoned = 0
+
+    def incr(self, counter: str, amount: int = 1):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    def record_latency(self, key: str, seconds: float):
+        with self._lock:
+            self._latencies.setdefault(key, deque(maxlen=LATENCY_WINDOW)).append(seconds)
+
+    def p95(self, key: str) -> Optional[float]:
+        """95th percentile latency of recent successful calls to ``key``."""
+        with self._lock:
+            samples = sorted(self._latencies.get(key, ()))
+        if len(samples) < MIN_HEDGE_SAMPLES:
+            return None
+        return samples[int(len(samples) * 0.95) - 1]
+
+
+def _discard_result(discard: Callable[[T], None], future: Future):
+    if future.exception() is None:
+        discard(future.result())
+
+
+class RequestPolicy:
+    """Timeouts, deadline and hedging applied to every client request.
+
+    ``timeout`` is passed to ``requests`` (connect and per-read timeout).
+    ``hedge_after`` fixes the hedge delay; by default it tracks each
+    endpoint's p95 latency.
+    """
+
+    def __init__(
+        self,
+        timeout: float = DEFAULT_TIMEOUT,
+        deadline: Optional[Deadline] = None,
+        hedge: bool = False,
+        hedge_after: Optional[float] = None,
+        stats: Optional[RequestStats] = None,
+    ):
+        self.timeout = timeout
+        self.deadline = deadline or Deadline()
+        self.hedge = hedge
+        self.hedge_after = hedge_after
+        self.stats = stats or RequestStats()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def without_deadline(self) -> 'RequestPolicy':
+        """A policy with the same timeouts and stats but no run deadline.
+
+        Used to finish work that was already prepared once the deadline
+        has stopped new fetches.
+        """
+        return RequestPolicy(
+            timeout=self.timeout,
+            hedge=self.hedge,
+            hedge_after=self.hedge_after,
+            stats=self.stats,
+        )
+
+    def hedge_delay(self, key: str) -> float:
+        if self.hedge_after is not None:
+            return self.hedge_after
+        return self.stats.p95(key) or DEFAULT_HEDGE_AFTER
+
+    def _request_timeout(self) -> float:
+        remaining = self.deadline.remaining()
+        if remaining is None:
+            return self.timeout
+        if remaining <= 0:
+            raise DeadlineExceeded("Run deadline reached")
+        return min(self.timeout, remaining)
+
+    def _timed(
+        self,
+        fn: Callable[[float], T],
+        key: str,
+        timeout: float,
+        lost: Optional[threading.Event] = None,
+    ) -> T:
+        self.stats.incr('requests')
+        started = time.monotonic()
+        try:
+            result = fn(timeout)
+        except requests.exceptions.Timeout:
+            # A hedge loser timing out after the run moved on is not a failure.
+            if lost is None or not lost.is_set():
+                self.stats.incr('timed_out')
+            raise
+        self.stats.record_latency(key, time.monotonic() - started)
+        return result
+
+    def call(
+        self,
+        fn: Callable[[float], T],
+        key: str,
+        idempotent: bool = False,
+        discard: Optional[Callable[[T], None]] = None,
+    ) -> T:
+        """Run ``fn(timeout)``, hedging it if allowed.
+
+        ``key`` groups latency samples, e.g. by endpoint path. ``discard`` is
+        called with the result of any hedged attempt that loses, e.g. to
+        close a streamed response.
+        """
+        timeout = self._request_timeout()
+        if not (self.hedge and idempotent):
+            return self._timed(fn, key, timeout)
+        return self._hedged(fn, key, timeout, discard)
+
+    def _hedged(
+        self,
+        fn: Callable[[float], T],
+        key: str,
+        timeout: float,
+        discard: Optional[Callable[[T], None]],
+    ) -> T:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='granola-hedge')
+
+        lost = {}
+        primary = self._submit(fn, key, timeout, lost)
+        futures = [primary]
+        done, _ = wait(futures, timeout=self.hedge_delay(key))
+        if not done:
+            try:
+                hedge_timeout = self._request_timeout()
+            except DeadlineExceeded:
+                pass
+            else:
+                self.stats.incr('hedged')
+                futures.append(self._submit(fn, key, hedge_timeout, lost))
+
+        errors = []
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is not primary:
+                        self.stats.incr('hedge_wins')
+                    for loser in futures:
+                        if loser is future:
+                            continue
+                        lost[loser].set()
+                        if not loser.done():
+                            self.stats.incr('abandoned')
+                        if discard is not None:
+                            loser.add_done_callback(partial(_discard_result, discard))
+                    return future.result()
+                errors.append(future.exception())
+        raise errors[0]
+
+    def _submit(self, fn: Callable[[float], T], key: str, timeout: float,
+                lost: Dict[Future, threading.Event]) -> Future:
+        event = threading.Event()
+        future = self._executor.submit(self._timed, fn, key, timeout, event)
+        lost[future] = event
+        return future
+
+    def close(self):
+        """Release hedge threads without waiting for abandoned duplicates."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
@@ -0,0 +1,118 @@
+"""Compact records for Granola meetings and utterances.
+
+The API's document dicts carry far more than export and upload use:
+``last_viewed_panel``, full attendee profiles, ProseMirror note trees.
+:class:`Meeting` and :class:`Utterance` keep only the fields those stages
+read, in ``__slots__`` objects, with speaker and attendee names interned so
+a name repeated across thousands of meetings is stored once. Build them
+with ``from_api`` and let the raw dict go.
+"""
+import sys
+from typing import Any, Dict, Optional, Tuple
+
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if type(value) is str else value
+
+
+def extract_notes_text(notes) -> str:
+    """Extract plain text from ProseMirror notes structure."""
+    if not notes:
+        return ""
+
+    if isinstance(notes, str):
+        return notes
+
+    def extract_text(node):
+        if isinstance(node, str):
+            return node
+        if isinstance(node, dict):
+            if 'text' in node:
+                return node['text']
+            if 'content' in node:
+                return ''.join(extract_text(c) for c in node['content'])
+        if isinstance(node, list):
+            return ''.join(extract_text(n) for n in node)
+        return ''
+
+    return extract_text(notes)
+
+
+class Meeting:
+    """The parts of a Granola document that export and upload use."""
+
+    __slots__ = ('id', 'title', 'created_at', 'summary', 'notes', 'attendees')
+
+    def __init__(
+        self,
+        id: Optional[str],
+        title: str = 'Untitled Meeting',
+        created_at: str = '',
+        summary: str = '',
+        notes: str = '',
+        attendees: Tuple[str, ...] = (),
+    ):
+        self.id = id
+        self.title = title
+        self.created_at = created_at
+        self.summary = summary
+        self.notes = notes
+        self.attendees = attendees
+
+    @classmethod
+    def from_api(cls, doc: Dict) -> 'Meeting':
+        """Build a meeting from a ``/v2/get-documents`` entry."""
+        notes = (
+            doc.get('notes_plain', '') or
+            doc.get('notes_markdown', '') or
+            extract_notes_text(doc.get('notes', ''))
+        )
+        attendees = tuple(
+            _intern(p.get('name', p.get('email', 'Unknown')))
+            for p in doc.get('people') or ()
+            if isinstance(p, dict)
+        )
+        return cls(
+            id=doc.get('id'),
+            title=doc.get('title', 'Untitled Meeting'),
+            created_at=doc.get('created_at', ''),
+            summary=doc.get('summary', ''),
+            notes=notes,
+            attendees=attendees,
+        )
+
+    def __repr__(self) -> str:
+        return f"Meeting(id={self.id!r}, title={self.title!r})"
+
+
+class Utterance:
+    """One line of a transcript."""
+
+    __slots__ = ('speaker', 'text', 'start_timestamp')
+
+    def __init__(self, speaker: str = 'Unknown', text: str = '', start_timestamp: str = ''):
+        self.speaker = speaker
+        self.text = text
+        self.start_timestamp = start_timestamp
+
+    @classmethod
+    def from_api(cls, utt: Dict) -> 'Utterance':
+        """Build an utterance from a ``/v1/get-document-transcript`` entry."""
+        return cls(
+            speaker=_intern(utt.get('speaker', 'Unknown')),
+            text=utt.get('text', ''),
+            start_timestamp=utt.get('start_timestamp', ''),
+        )
+
+    def __repr__(self) -> str:
+        return f"Utterance(speaker={self.speaker!r}, text={self.text!r})"
+
+
+def as_meeting(doc) -> Meeting:
+    """Accept either a :class:`Meeting` or a raw document dict."""
+    return doc if isinstance(doc, Meeting) else Meeting.from_api(doc)
+
+
+def as_utterance(utt) -> Utterance:
+    """Accept either an :class:`Utterance` or a raw utterance dict."""
+    return utt if isinstance(utt, Utterance) else Utterance.from_api(utt)
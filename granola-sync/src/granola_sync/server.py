@@ -0,0 +1,541 @@
+"""Self-hostable reference implementation of the cloud API.
+
+Implements the contract in ``granola-api/openapi.yaml`` (plus
+``/api/register``, ``/api/upload`` and ``/api/append``, which the CLI uses) with the
+standard library only: ``http.server`` for HTTP and SQLite for storage.
+Transcripts are upserted in one transaction per upload and indexed with
+an FTS5 trigram index (SQLite 3.34 or later), so listing and search do not
+scan every stored transcript. Search matches substrings, case-insensitively,
+like the worker; queries shorter than three characters can't use the index
+and scan the user's transcripts.
+
+It is meant for self-hosting a small team and for load testing
+:class:`~granola_sync.cloud.CloudClient` offline. The ChatGPT OAuth flow
+served by the Cloudflare worker is not implemented; clients authenticate
+with their API key.
+"""
+import hashlib
+import hmac
+import json
+import queue
+import sqlite3
+import uuid
+from contextlib import closing, contextmanager
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlparse
+
+CORS_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Methods': 'GET, POST, OPTIONS',
+    'Access-Control-Allow-Headers': 'Content-Type, Authorization, X-API-Key',
+}
+
+# SQLite's default limit on bound parameters is 999 on older builds.
+_MAX_PARAMS = 500
+# Trigram indexes can't narrow down shorter queries.
+_MIN_INDEXED_QUERY = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id TEXT PRIMARY KEY,
+    email TEXT NOT NULL UNIQUE,
+    name TEXT,
+    api_key TEXT NOT NULL UNIQUE,
+    password_hash TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    last_updated TEXT
+);
+
+CREATE TABLE IF NOT EXISTS transcripts (
+    user_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    title TEXT,
+    date TEXT,
+    created_at TEXT,
+    attendees TEXT,
+    summary TEXT,
+    notes TEXT,
+    transcript TEXT,
+    uploaded_at TEXT NOT NULL,
+    UNIQUE (user_id, id)
+);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS transcripts_fts USING fts5(
+    title, summary, notes, transcript,
+    content='transcripts', content_rowid='rowid', tokenize='trigram'
+);
+
+CREATE TRIGGER IF NOT EXISTS transcripts_ai AFTER INSERT ON transcripts BEGIN
+    INSERT INTO transcripts_fts(rowid, title, summary, notes, transcript)
+    VALUES (new.rowid, new.title, new.summary, new.notes, new.transcript);
+END;
+
+CREATE TRIGGER IF NOT EXISTS transcripts_ad AFTER DELETE ON transcripts BEGIN
+    INSERT INTO transcripts_fts(transcripts_fts, rowid, title, summary, notes, transcript)
+    VALUES ('delete', old.rowid, old.title, old.summary, old.notes, old.transcript);
+END;
+
+CREATE TRIGGER IF NOT EXISTS transcripts_au AFTER UPDATE ON transcripts BEGIN
+    INSERT INTO transcripts_fts(transcripts_fts, rowid, title, summary, notes, transcript)
+    VALUES ('delete', old.rowid, old.title, old.summary, old.notes, old.transcript);
+    INSERT INTO transcripts_fts(rowid, title, summary, notes, transcript)
+    VALUES (new.rowid, new.title, new.summary, new.notes, new.transcript);
+END;
+"""
+
+
+class APIError(Exception):
+    """An error returned to the client as ``{"error": message}``."""
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+
+def hash_password(password: str) -> str:
+    """Hash a password the same way the Cloudflare worker does."""
+    return hashlib.sha256(password.encode('utf-8')).hexdigest()
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
+
+
+def _chunks(items: List[Any], size: int) -> Iterable[List[Any]]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def find_snippets(text: str, query: str, max_snippets: int = 3, context_chars: int = 100) -> List[str]:
+    """Return snippets around occurrences of ``query`` in ``text``."""
+    snippets = []
+    search_index = 0
+
+    while len(snippets) < max_snippets:
+        index = text.find(query, search_index)
+        if index == -1:
+            break
+
+        start = max(0, index - context_chars)
+        end = min(len(text), index + len(query) + context_chars)
+
+        snippet = text[start:end]
+        if start > 0:
+            snippet = '...' + snippet
+        if end < len(text):
+            snippet = snippet + '...'
+
+        snippets.append(snippet)
+        search_index = index + len(query)
+
+    return snippets
+
+
+class TranscriptStore:
+    """SQLite-backed storage for users and transcripts.
+
+    Safe to share between threads. The HTTP server starts a thread per
+    request, so connections are pooled rather than kept per thread: each
+    call borrows one and returns it, and at most ``pool_size`` idle
+    connections are kept open.
+    """
+
+    def __init__(self, path: Path, pool_size: int = 8):
+        self.path = str(path)
+        self._pool: 'queue.LifoQueue[sqlite3.Connection]' = queue.LifoQueue(maxsize=pool_size)
+        with self._connection() as conn, conn:
+            # Databases from earlier versions indexed words rather than trigrams.
+            row = conn.execute(
+                "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'transcripts_fts'"
+            ).fetchone()
+            reindex = row is not None and 'trigram' not in row['sql']
+            if reindex:
+                conn.execute('DROP TABLE transcripts_fts')
+            conn.executescript(SCHEMA)
+            if reindex:
+                conn.execute("INSERT INTO transcripts_fts(transcripts_fts) VALUES ('rebuild')")
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a connection from the pool, opening one if none is idle."""
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = self._open()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            try:
+                self._pool.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    def close(self):
+        """Close idle pooled connections."""
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def authenticate(self, api_key: str) -> Optional[Dict[str, Any]]:
+        """Look up the user owning an API key."""
+        with self._connection() as conn:
+            row = conn.execute('SELECT * FROM users WHERE api_key = ?', (api_key,)).fetchone()
+        return dict(row) if row else None
+
+    def register(self, email: str, password: str, name: Optional[str] = None) -> Dict[str, Any]:
+        """Create a user, or return an existing user's key if the password matches.
+
+        Unlike the worker, an existing account's password is never replaced:
+        a wrong password raises a 401 :class:`APIError`.
+        """
+        email = email.lower().strip()
+        password_hash = hash_password(password)
+
+        with self._connection() as conn, conn:
+            row = conn.execute(
+                'SELECT id, api_key, password_hash FROM users WHERE email = ?', (email,)
+            ).fetchone()
+            if row:
+                if not hmac.compare_digest(row['password_hash'], password_hash):
+                    raise APIError('Invalid email or password', 401)
+                return {'message': 'Logged in', 'api_key': row['api_key'], 'user_id': row['id']}
+
+            user_id = str(uuid.uuid4())
+            api_key = 'gra_' + uuid.uuid4().hex
+            conn.execute(
+                'INSERT INTO users (id, email, name, api_key, password_hash, created_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (user_id, email, name or email.split('@')[0], api_key, password_hash, _now()),
+            )
+        return {'message': 'User registered successfully', 'api_key': api_key, 'user_id': user_id}
+
+    def upsert_transcripts(self, user_id: str, transcripts: List[Dict[str, Any]]) -> Dict[str, int]:
+        """Insert or replace a batch of transcripts in one transaction."""
+        now = _now()
+        ids = [t.get('id') for t in transcripts]
+
+        with self._connection() as conn, conn:
+            existing = set()
+            for chunk in _chunks(ids, _MAX_PARAMS):
+                placeholders = ','.join('?' * len(chunk))
+                existing.update(
+                    row['id'] for row in conn.execute(
+                        f'SELECT id FROM transcripts WHERE user_id = ? AND id IN ({placeholders})',
+                        [user_id, *chunk],
+                    )
+                )
+
+            conn.executemany(
+                'INSERT INTO transcripts '
+                '(user_id, id, title, date, created_at, attendees, summary, notes, transcript, uploaded_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) '
+                'ON CONFLICT (user_id, id) DO UPDATE SET '
+                'title = excluded.title, date = excluded.date, created_at = excluded.created_at, '
+                'attendees = excluded.attendees, summary = excluded.summary, notes = excluded.notes, '
+                'transcript = excluded.transcript, uploaded_at = excluded.uploaded_at',
+                [
+                    (
+                        user_id, t.get('id'), t.get('title'), t.get('date'), t.get('created_at'),
+                        json.dumps(t.get('attendees') or []), t.get('summary'), t.get('notes'),
+                        t.get('transcript'), now,
+                    )
+                    for t in transcripts
+                ],
+            )
+            conn.execute('UPDATE users SET last_updated = ? WHERE id = ?', (now, user_id))
+            total = conn.execute('SELECT COUNT(*) FROM transcripts WHERE user_id = ?', (user_id,)).fetchone()[0]
+
+        updated = len(existing)
+        return {'uploaded': len(set(ids)) - updated, 'updated': updated, 'total': total}
+
+    def append_transcripts(self, user_id: str, appends: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Append new lines to stored transcripts in one transaction.
+
+        Each item's ``base_hash`` must match the SHA-256 of the stored
+        transcript; otherwise its id is returned in ``rejected`` and nothing
+        is changed for it.
+        """
+        now = _now()
+        rejected = []
+        updates = []
+
+        with self._connection() as conn, conn:
+            stored = {}
+            ids = [a.get('id') for a in appends]
+            for chunk in _chunks(ids, _MAX_PARAMS):
+                placeholders = ','.join('?' * len(chunk))
+                for row in conn.execute(
+                    f'SELECT id, transcript FROM transcripts WHERE user_id = ? AND id IN ({placeholders})',
+                    [user_id, *chunk],
+                ):
+                    stored[row['id']] = row['transcript'] or ''
+
+            for item in appends:
+                current = stored.get(item.get('id'))
+                if current is None or hashlib.sha256(current.encode('utf-8')).hexdigest() != item.get('base_hash'):
+                    rejected.append(item.get('id'))
+                    continue
+
+                added = item.get('transcript') or ''
+                merged = f"{current}\n{added}" if current and added else current + added
+                stored[item['id']] = merged
+                updates.append((
+                    item.get('title'), item.get('date'), item.get('created_at'),
+                    json.dumps(item.get('attendees') or []), item.get('summary'), item.get('notes'),
+                    merged, now, user_id, item['id'],
+                ))
+
+            conn.executemany(
+                'UPDATE transcripts SET title = ?, date = ?, created_at = ?, attendees = ?, summary = ?, '
+                'notes = ?, transcript = ?, uploaded_at = ? WHERE user_id = ? AND id = ?',
+                updates,
+            )
+            if updates:
+                conn.execute('UPDATE users SET last_updated = ? WHERE id = ?', (now, user_id))
+
+        return {'appended': len(updates), 'rejected': rejected}
+
+    def list_transcripts(self, user_id: str, limit: int, offset: int) -> Tuple[List[Dict[str, Any]], int]:
+        """Return one page of transcript summaries in upload order, and the total."""
+        with self._connection() as conn:
+            rows = conn.execute(
+                'SELECT id, title, date, attendees, summary FROM transcripts '
+                'WHERE user_id = ? ORDER BY rowid LIMIT ? OFFSET ?',
+                (user_id, limit, offset),
+            ).fetchall()
+            total = conn.execute('SELECT COUNT(*) FROM transcripts WHERE user_id = ?', (user_id,)).fetchone()[0]
+        return [_summary(row) for row in rows], total
+
+    def get_transcript(self, user_id: str, transcript_id: str) -> Optional[Dict[str, Any]]:
+        """Return a full transcript record."""
+        with self._connection() as conn:
+            row = conn.execute(
+                'SELECT * FROM transcripts WHERE user_id = ? AND id = ?', (user_id, transcript_id)
+            ).fetchone()
+        if not row:
+            return None
+
+        record = _summary(row)
+        record.update({
+            'created_at': row['created_at'],
+            'notes': row['notes'],
+            'transcript': row['transcript'],
+            'userId': row['user_id'],
+            'uploadedAt': row['uploaded_at'],
+        })
+        return record
+
+    def search(self, user_id: str, query: str, limit: int) -> List[Dict[str, Any]]:
+        """Find transcripts containing ``query`` as a case-insensitive substring.
+
+        Candidates come from the trigram index, newest first; ordering by
+        rowid lets SQLite stream them instead of ranking every match. As in
+        the Cloudflare worker, the search stops once ``limit`` matches are
+        confirmed and sorts those by relevance (number of occurrences), so
+        only that page of transcripts is read and lowercased.
+        """
+        needle = query.lower()
+        with self._connection() as conn:
+            if len(needle) >= _MIN_INDEXED_QUERY:
+                phrase = '"' + needle.replace('"', '""') + '"'
+                rows = conn.execute(
+                    'SELECT t.* FROM transcripts_fts JOIN transcripts t ON t.rowid = transcripts_fts.rowid '
+                    'WHERE transcripts_fts MATCH ? AND t.user_id = ? ORDER BY transcripts_fts.rowid DESC',
+                    (phrase, user_id),
+                )
+            else:
+                rows = conn.execute(
+                    'SELECT * FROM transcripts WHERE user_id = ? ORDER BY rowid DESC', (user_id,)
+                )
+
+            results = []
+            with closing(rows):
+                for row in rows:
+                    if len(results) >= limit:
+                        break
+                    text = ' '.join(
+                        row[col] for col in ('title', 'summary', 'notes', 'transcript') if row[col]
+                    ).lower()
+                    if needle not in text:
+                        continue
+                    result = _summary(row)
+                    result['snippets'] = find_snippets(text, needle)
+                    result['relevance'] = text.count(needle)
+                    results.append(result)
+
+        results.sort(key=lambda r: r['relevance'], reverse=True)
+        return results
+
+    def stats(self, user: Dict[str, Any]) -> Dict[str, Any]:
+        """Return the transcript count and last upload time for a user."""
+        with self._connection() as conn:
+            total = conn.execute(
+                'SELECT COUNT(*) FROM transcripts WHERE user_id = ?', (user['id'],)
+            ).fetchone()[0]
+        return {
+            'totalTranscripts': total,
+            'lastUpdated': user.get('last_updated'),
+            'user': {'name': user.get('name'), 'email': user.get('email')},
+        }
+
+
+def _summary(row: sqlite3.Row) -> Dict[str, Any]:
+    return {
+        'id': row['id'],
+        'title': row['title'],
+        'date': row['date'],
+        'attendees': json.loads(row['attendees'] or '[]'),
+        'summary': row['summary'],
+    }
+
+
+class APIRequestHandler(BaseHTTPRequestHandler):
+    """Routes requests to the :class:`TranscriptStore` on ``self.server``."""
+
+    server_version = 'granola-sync-server'
+
+    @property
+    def store(self) -> TranscriptStore:
+        return self.server.store
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+    def _send_json(self, data: Any, status: int = 200):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in CORS_HEADERS.items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self) -> Dict[str, Any]:
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            return json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            raise APIError('Invalid JSON body')
+
+    def _authenticate(self) -> Dict[str, Any]:
+        api_key = self.headers.get('X-API-Key') or (self.headers.get('Authorization') or '').replace('Bearer ', '')
+        user = self.store.authenticate(api_key) if api_key else None
+        if not user:
+            raise APIError('Invalid or missing API key', 401)
+        return user
+
+    def _dispatch(self, method: str):
+        url = urlparse(self.path)
+        path = url.path
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+
+        try:
+            if path in ('/', '/health'):
+                return self._send_json({'status': 'ok', 'service': 'granola-api'})
+
+            if path == '/api/register' and method == 'POST':
+                body = self._read_json()
+                if not body.get('email'):
+                    raise APIError('Email is required')
+                if not body.get('password'):
+                    raise APIError('Password is required')
+                return self._send_json(self.store.register(body['email'], body['password'], body.get('name')))
+
+            user = self._authenticate()
+
+            if path == '/api/upload' and method == 'POST':
+                transcripts = self._read_json().get('transcripts')
+                if not isinstance(transcripts, list):
+                    raise APIError('transcripts array is required')
+                if not all(isinstance(t, dict) and t.get('id') for t in transcripts):
+                    raise APIError('every transcript needs an id')
+                result = self.store.upsert_transcripts(user['id'], transcripts)
+                return self._send_json({'message': 'Upload successful', **result})
+
+            if path == '/api/append' and method == 'POST':
+                appends = self._read_json().get('appends')
+                if not isinstance(appends, list):
+                    raise APIError('appends array is required')
+                if not all(isinstance(a, dict) and a.get('id') for a in appends):
+                    raise APIError('every append needs an id')
+                return self._send_json({'message': 'Append successful',
+                                        **self.store.append_transcripts(user['id'], appends)})
+
+            if path == '/api/transcripts' and method == 'GET':
+                limit = int(params.get('limit', 50))
+                offset = int(params.get('offset', 0))
+                transcripts, total = self.store.list_transcripts(user['id'], limit, offset)
+                return self._send_json({'transcripts': transcripts, 'total': total, 'limit': limit, 'offset': offset})
+
+            if path.startswith('/api/transcript/') and method == 'GET':
+                transcript = self.store.get_transcript(user['id'], unquote(path[len('/api/transcript/'):]))
+                if not transcript:
+                    raise APIError('Transcript not found', 404)
+                return self._send_json(transcript)
+
+            if path == '/api/search' and method == 'GET':
+                query = params.get('q', '').lower()
+                if not query:
+                    raise APIError('Search query (q) is required')
+                results = self.store.search(user['id'], query, int(params.get('limit', 20)))
+                return self._send_json({'results': results, 'total': len(results), 'query': query})
+
+            if path == '/api/stats' and method == 'GET':
+                return self._send_json(self.store.stats(user))
+
+            raise APIError('Not found', 404)
+        except APIError as e:
+            self._send_json({'error': str(e)}, e.status)
+        except ValueError as e:
+            self._send_json({'error': f'Invalid parameter: {e}'}, 400)
+        except Exception as e:
+            self.log_error('Unhandled error: %r', e)
+            self._send_json({'error': 'Internal server error'}, 500)
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def do_OPTIONS(self):
+        self.send_response(204)
+        for key, value in CORS_HEADERS.items():
+            self.send_header(key, value)
+        self.end_headers()
+
+
+class APIServer(ThreadingHTTPServer):
+    """Threaded HTTP server bound to a :class:`TranscriptStore`."""
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], store: TranscriptStore, quiet: bool = False):
+        super().__init__(address, APIRequestHandler)
+        self.store = store
+        self.quiet = quiet
+
+    def server_close(self):
+        super().server_close()
+        self.store.close()
+
+
+def create_server(db_path: Path, host: str = '127.0.0.1', port: int = 8787, quiet: bool = False) -> APIServer:
+    """Open (or create) the database and bind a server to ``host:port``."""
+    return APIServer((host, port), TranscriptStore(db_path), quiet=quiet)
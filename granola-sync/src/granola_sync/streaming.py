@@ -0,0 +1,108 @@
+"""Incremental parsing of large JSON array responses."""
+import codecs
+import json
+from typing import Any, Iterable, Iterator, Optional
+
+_WHITESPACE = ' \t\n\r'
+_DELIMITERS = _WHITESPACE + ',:]}'
+# Drop consumed text from the buffer once this much has accumulated.
+_COMPACT_AT = 1 << 16
+
+
+class _Buffer:
+    """Text decoded from a byte stream, read on demand."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self.text = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        """Read another chunk. Returns False at end of stream."""
+        if self.eof:
+            return False
+        if self.pos > _COMPACT_AT:
+            self.text = self.text[self.pos:]
+            self.pos = 0
+        for chunk in self._chunks:
+            if chunk:
+                self.text += self._decoder.decode(chunk)
+                return True
+        self.text += self._decoder.decode(b'', final=True)
+        self.eof = True
+        return False
+
+    def peek(self) -> Optional[str]:
+        """Skip whitespace and return the next character, or None at the end."""
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.fill():
+                return None
+
+    def expect(self, chars: str) -> str:
+        char = self.peek()
+        if char is None or char not in chars:
+            raise ValueError(f"Expected one of {chars!r} at offset {self.pos}, got {char!r}")
+        self.pos += 1
+        return char
+
+    def _delimited(self, end: int) -> bool:
+        return end < len(self.text) and self.text[end] in _DELIMITERS
+
+    def value(self, decoder: json.JSONDecoder) -> Any:
+        """Decode the next complete JSON value, reading more input as needed."""
+        self.peek()
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+            # A number may continue in the next chunk ("6." + "25") unless a
+            # delimiter after it has already arrived.
+            if isinstance(value, (int, float)) and not self.eof and not self._delimited(end):
+                self.fill()
+                continue
+            self.pos = end
+            return value
+
+
+def iter_json_items(chunks: Iterable[bytes], key: str) -> Iterator[Any]:
+    """Yield the elements of a JSON array as they arrive.
+
+    The document is either the array itself or an object holding the array
+    under ``key``; other object members are skipped. Nothing is yielded if
+    the array isn't there. Only one element is held in memory at a time.
+    """
+    buf = _Buffer(chunks)
+    decoder = json.JSONDecoder()
+
+    first = buf.peek()
+    if first == '{':
+        buf.pos += 1
+        while True:
+            if buf.peek() == '}':
+                return
+            name = buf.value(decoder)
+            buf.expect(':')
+            if name == key and buf.peek() == '[':
+                break
+            buf.value(decoder)
+            if buf.expect(',}') == '}':
+                return
+    elif first != '[':
+        return
+
+    buf.expect('[')
+    if buf.peek() == ']':
+        return
+    while True:
+        yield buf.value(decoder)
+        if buf.expect(',]') == ']':
+            return
@@ -0,0 +1,170 @@
+"""Tests for the asyncio clients."""
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip('aiohttp')
+
+from granola_sync.aio import (  # noqa: E402
+    AsyncCloudClient,
+    AsyncGranolaClient,
+    create_session,
+    upload_account,
+)
+from granola_sync.cloud import CloudAPIError, CloudClient  # noqa: E402
+from granola_sync.server import create_server  # noqa: E402
+
+
+@pytest.fixture
+def api_url(tmp_path):
+    server = create_server(tmp_path / 'server.db', port=0, quiet=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f'http://127.0.0.1:{server.server_address[1]}'
+    server.shutdown()
+    server.server_close()
+
+
+class FakeGranola(BaseHTTPRequestHandler):
+    documents = []
+    # document_id -> HTTP status of its transcript request
+    statuses = {}
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        if self.path == '/v2/get-documents':
+            status, data = 200, {'docs': self.documents[body['offset']:body['offset'] + body['limit']]}
+        else:
+            document_id = body['document_id']
+            status = self.statuses.get(document_id, 200)
+            data = [{'speaker': 'Ana', 'text': f'about {document_id}'}]
+        payload = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+@pytest.fixture
+def granola(tmp_path, monkeypatch):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeGranola)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(AsyncGranolaClient, 'BASE_URL', f'http://127.0.0.1:{server.server_address[1]}')
+    monkeypatch.setattr(FakeGranola, 'documents', [
+        {'id': 'doc-1', 'title': 'One'},
+        {'id': 'doc-2', 'title': 'Two'},
+        {'id': 'doc-3', 'title': 'Deleted', 'deleted_at': '2024-01-01'},
+        {'id': 'doc-4', 'title': 'Four'},
+    ])
+    monkeypatch.setattr(FakeGranola, 'statuses', {})
+    credentials = tmp_path / 'supabase.json'
+    credentials.write_text(json.dumps({'workos_tokens': json.dumps({'access_token': 't'})}))
+    yield credentials
+    server.shutdown()
+    server.server_close()
+
+
+def upload(credentials, api_url, api_key, **kwargs):
+    async def run():
+        async with create_session() as session:
+            granola = AsyncGranolaClient(credentials, session=session)
+            cloud = AsyncCloudClient(api_url, api_key, session=session)
+            return await upload_account(granola, cloud, **kwargs)
+    return asyncio.run(run())
+
+
+def test_upload_account(granola, api_url):
+    key = CloudClient.register(api_url, 'ana@example.com', 'secret')['api_key']
+
+    result = upload(granola, api_url, key, batch_size=2)
+
+    assert result == {'documents': 3, 'uploaded': 3, 'updated': 0, 'skipped': 0}
+    results = CloudClient(api_url, key).search('about doc-4')['results']
+    assert [r['id'] for r in results] == ['doc-4']
+
+
+def test_upload_account_skips_failed_transcripts_but_not_missing_ones(granola, api_url, monkeypatch):
+    key = CloudClient.register(api_url, 'ana@example.com', 'secret')['api_key']
+    monkeypatch.setattr(FakeGranola, 'statuses', {'doc-1': 500, 'doc-2': 404})
+
+    result = upload(granola, api_url, key)
+
+    assert result == {'documents': 3, 'uploaded': 2, 'updated': 0, 'skipped': 1}
+    cloud = CloudClient(api_url, key)
+    assert sorted(t['id'] for t in cloud.list_transcripts()['transcripts']) == ['doc-2', 'doc-4']
+
+
+def test_cloud_error_has_status(api_url):
+    async def stats():
+        async with AsyncCloudClient(api_url, 'gra_wrong') as cloud:
+            return await cloud.get_stats()
+
+    with pytest.raises(CloudAPIError) as excinfo:
+        asyncio.run(stats())
+    assert excinfo.value.status == 401
+
+
+def test_cloud_client_matches_sync_client(api_url):
+    key = CloudClient.register(api_url, 'ana@example.com', 'secret')['api_key']
+
+    async def run():
+        async with AsyncCloudClient(api_url, key) as cloud:
+            await cloud.upload_transcripts([{'id': 't1', 'title': 'Hiring', 'transcript': 'Ana: hiring'}])
+            return await cloud.search('hiring')
+
+    assert asyncio.run(run()) == CloudClient(api_url, key).search('hiring')
+
+
+class Trickle(BaseHTTPRequestHandler):
+    """Sends a JSON body a few bytes at a time, ``pause`` seconds apart."""
+
+    pause = 0.0
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        data = json.dumps({'totalTranscripts': 3}).encode()
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        for i in range(0, len(data), 4):
+            time.sleep(self.pause)
+            self.wfile.write(data[i:i + 4])
+            self.wfile.flush()
+
+
+@pytest.fixture
+def trickle_url():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Trickle)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f'http://127.0.0.1:{server.server_address[1]}'
+    server.shutdown()
+    server.server_close()
+
+
+def get_stats(api_url, timeout):
+    async def run():
+        async with create_session(timeout=timeout) as session:
+            return await AsyncCloudClient(api_url, 'key', session=session).get_stats()
+    return asyncio.run(run())
+
+
+def test_timeout_does_not_cut_off_a_response_that_keeps_arriving(trickle_url, monkeypatch):
+    monkeypatch.setattr(Trickle, 'pause', 0.05)
+
+    # About 0.3s in total, but never more than 0.05s without data.
+    assert get_stats(trickle_url, timeout=0.2) == {'totalTranscripts': 3}
+
+
+def test_timeout_applies_to_a_stalled_response(trickle_url, monkeypatch):
+    monkeypatch.setattr(Trickle, 'pause', 0.5)
+
+    with pytest.raises(asyncio.TimeoutError):
+        get_stats(trickle_url, timeout=0.2)
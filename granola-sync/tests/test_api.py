@@ -0,0 +1,119 @@
+"""Tests for how the Granola client reports transcript fetches."""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from granola_sync.api import GranolaClient
+from granola_sync.latency import RequestPolicy
+from granola_sync.models import Utterance
+
+UTTERANCES = [{'speaker': 'Ana', 'text': 'hi', 'start_timestamp': ''}]
+
+
+class FakeGranola(BaseHTTPRequestHandler):
+    # document_id -> (status, delay before headers, delay mid-body)
+    responses = {}
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        status, delay, stall = self.responses.get(body.get('document_id'), (200, 0, 0))
+        time.sleep(delay)
+        data = json.dumps(UTTERANCES).encode() if status == 200 else b'{}'
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        if stall:
+            self.wfile.write(data[:5])
+            self.wfile.flush()
+            time.sleep(stall)
+        self.wfile.write(data)
+
+
+@pytest.fixture
+def granola(tmp_path, monkeypatch):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeGranola)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    credentials = tmp_path / 'supabase.json'
+    credentials.write_text(json.dumps({'workos_tokens': json.dumps({'access_token': 't'})}))
+    monkeypatch.setattr(GranolaClient, 'BASE_URL', f'http://127.0.0.1:{server.server_address[1]}')
+    monkeypatch.setattr(GranolaClient, 'CREDENTIALS_PATH', credentials)
+    FakeGranola.responses = {}
+
+    def make(**kwargs):
+        return GranolaClient(policy=RequestPolicy(**kwargs))
+
+    yield make
+    server.shutdown()
+    server.server_close()
+
+
+def test_transcript(granola):
+    client = granola()
+
+    assert client.get_transcript('doc') == UTTERANCES
+    utterances = list(client.get_transcript_stream('doc'))
+    assert [(u.speaker, u.text) for u in utterances] == [('Ana', 'hi')]
+    assert all(isinstance(u, Utterance) for u in utterances)
+
+
+def test_missing_transcript_is_none(granola):
+    FakeGranola.responses = {'doc': (404, 0, 0)}
+    client = granola()
+
+    assert client.get_transcript('doc') is None
+    assert client.get_transcript_stream('doc') is None
+
+
+@pytest.mark.parametrize('method', ['get_transcript', 'get_transcript_stream'])
+def test_server_error_is_raised(granola, method):
+    FakeGranola.responses = {'doc': (500, 0, 0)}
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        getattr(granola(), method)('doc')
+
+
+@pytest.mark.parametrize('method', ['get_transcript', 'get_transcript_stream'])
+def test_timeout_is_raised_and_counted(granola, method):
+    FakeGranola.responses = {'doc': (200, 0.5, 0)}
+    client = granola(timeout=0.1)
+
+    with pytest.raises(requests.exceptions.Timeout):
+        getattr(client, method)('doc')
+    assert client.policy.stats.timed_out == 1
+
+
+def test_timeout_while_reading_body_is_raised_and_counted(granola):
+    FakeGranola.responses = {'doc': (200, 0, 0.5)}
+    client = granola(timeout=0.1)
+
+    utterances = client.get_transcript_stream('doc')
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        list(utterances)
+    assert client.policy.stats.timed_out == 1
+
+
+def test_losing_hedged_stream_is_closed(granola, monkeypatch):
+    closed = []
+    close = requests.Response.close
+    monkeypatch.setattr(requests.Response, 'close', lambda resp: (closed.append(resp), close(resp)))
+    FakeGranola.responses = {'doc': (200, 0.3, 0)}
+    client = granola(hedge=True, hedge_after=0.05)
+    try:
+        utterances = client.get_transcript_stream('doc')
+        # The hedge is just as slow; whichever wins, the other is closed.
+        assert len(list(utterances)) == 1
+        deadline = time.monotonic() + 2
+        while len(closed) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        client.policy.close()
+
+    assert client.policy.stats.hedged == 1
+    assert len(closed) == 2
@@ -0,0 +1,122 @@
+"""Tests for uploading many accounts with batch-upload."""
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip('aiohttp')
+
+from granola_sync.aio import AsyncGranolaClient  # noqa: E402
+from granola_sync.batch import Profile, load_profiles, run_batch  # noqa: E402
+from granola_sync.cloud import CloudClient  # noqa: E402
+from granola_sync.server import create_server  # noqa: E402
+
+
+class FakeGranola(BaseHTTPRequestHandler):
+    """Two documents for every access token."""
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        token = self.headers['Authorization'].split()[-1]
+        if self.path == '/v2/get-documents':
+            docs = [{'id': f'{token}-{i}', 'title': f'Meeting {i}'} for i in range(2)]
+            data = {'docs': docs[body['offset']:body['offset'] + body['limit']]}
+        else:
+            data = [{'speaker': token, 'text': 'hello'}]
+        payload = json.dumps(data).encode()
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+@pytest.fixture
+def api_url(tmp_path, monkeypatch):
+    granola = ThreadingHTTPServer(('127.0.0.1', 0), FakeGranola)
+    cloud = create_server(tmp_path / 'server.db', port=0, quiet=True)
+    for server in (granola, cloud):
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(AsyncGranolaClient, 'BASE_URL', f'http://127.0.0.1:{granola.server_address[1]}')
+    yield f'http://127.0.0.1:{cloud.server_address[1]}'
+    for server in (granola, cloud):
+        server.shutdown()
+        server.server_close()
+
+
+def write_json(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data))
+
+
+def make_profile(root, name, config=None):
+    write_json(root / name / 'supabase.json', {'workos_tokens': json.dumps({'access_token': name})})
+    if config is not None:
+        write_json(root / name / 'config.json', config)
+
+
+def test_load_profiles_from_directory(tmp_path):
+    make_profile(tmp_path, 'bob')
+    make_profile(tmp_path, 'alice')
+    (tmp_path / 'no-credentials').mkdir()
+    (tmp_path / 'notes.txt').write_text('')
+
+    profiles = load_profiles(tmp_path)
+
+    assert profiles == [
+        Profile('alice', tmp_path / 'alice' / 'supabase.json', tmp_path / 'alice' / 'config.json',
+                tmp_path / 'alice' / 'state.json'),
+        Profile('bob', tmp_path / 'bob' / 'supabase.json', tmp_path / 'bob' / 'config.json',
+                tmp_path / 'bob' / 'state.json'),
+    ]
+
+
+def test_load_profiles_from_manifest(tmp_path):
+    manifest = tmp_path / 'etc' / 'profiles.json'
+    write_json(manifest, {'profiles': [
+        {'name': 'alice'},
+        {'name': 'bob', 'dir': 'accounts/bob', 'state': '/var/lib/granola/bob.json'},
+        {'name': 'carol', 'credentials': 'shared/carol.json', 'config': 'carol.json'},
+    ]})
+    base = tmp_path / 'etc'
+
+    alice, bob, carol = load_profiles(manifest)
+
+    assert alice == Profile('alice', base / 'alice' / 'supabase.json', base / 'alice' / 'config.json',
+                            base / 'alice' / 'state.json')
+    assert bob == Profile('bob', base / 'accounts/bob/supabase.json', base / 'accounts/bob/config.json',
+                          Path('/var/lib/granola/bob.json'))
+    assert carol == Profile('carol', base / 'shared/carol.json', base / 'carol.json',
+                            base / 'carol' / 'state.json')
+
+
+def test_failing_accounts_do_not_stop_the_others(tmp_path, api_url):
+    key = CloudClient.register(api_url, 'alice@example.com', 'secret')['api_key']
+    make_profile(tmp_path, 'alice', {'api_url': api_url, 'api_key': key})
+    make_profile(tmp_path, 'bob', {'api_url': api_url, 'api_key': 'gra_wrong'})
+    make_profile(tmp_path, 'carol', {'api_url': api_url})
+    make_profile(tmp_path, 'dave', {'api_url': api_url, 'api_key': key})
+    (tmp_path / 'dave' / 'supabase.json').write_text('not json')
+
+    report = asyncio.run(run_batch(load_profiles(tmp_path), workers=2))
+
+    alice, bob, carol, dave = report.results
+    assert (alice.ok, alice.documents, alice.uploaded) == (True, 2, 2)
+    assert '401' in bob.error
+    assert 'api_url and api_key must be set' in carol.error
+    assert dave.error.startswith('JSONDecodeError')
+    assert report.failed == [bob, carol, dave]
+    assert report.uploaded == 2
+
+    assert sorted(t['id'] for t in CloudClient(api_url, key).list_transcripts()['transcripts']) == [
+        'alice-0', 'alice-1',
+    ]
+    for result in report.results:
+        state = json.loads((tmp_path / result.name / 'state.json').read_text())
+        assert state['last_upload']['uploaded'] == result.uploaded
+        assert state['last_upload']['error'] == result.error
@@ -0,0 +1,132 @@
+"""Tests for planning delta uploads."""
+import hashlib
+
+import pytest
+
+from granola_sync.cloud import plan_upload, prepare_transcript_for_upload
+from granola_sync.models import Meeting, Utterance
+
+DOC = {
+    'id': 'doc-1',
+    'title': 'Weekly sync',
+    'created_at': '2024-01-15T10:00:00Z',
+    'summary': 'Planning',
+    'notes_plain': 'Notes',
+    'people': [{'name': 'Ana'}, {'email': 'bo@example.com'}],
+}
+
+
+def utterances(*texts):
+    return [{'speaker': 'Ana' if i % 2 else 'Bö', 'text': text} for i, text in enumerate(texts)]
+
+
+def sha256(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def merge(stored, added):
+    """Apply an append the way the server and worker do."""
+    return f"{stored}\n{added}" if stored and added else stored + added
+
+
+def uploaded(transcript):
+    """Plan a first upload and return what the server stores and the state kept."""
+    plan = plan_upload(DOC, transcript, None)
+    return plan.full['transcript'], plan.state
+
+
+def test_first_upload_is_full():
+    plan = plan_upload(DOC, utterances('hi', 'there'), None)
+
+    assert plan.delta is None
+    assert not plan.unchanged
+    assert plan.full == prepare_transcript_for_upload(DOC, utterances('hi', 'there'))
+    assert plan.state['utterances'] == 2
+    assert plan.state['hash'] == sha256(plan.full['transcript'])
+
+
+def test_unchanged():
+    _, state = uploaded(utterances('hi', 'there'))
+
+    plan = plan_upload(DOC, utterances('hi', 'there'), state)
+
+    assert plan.unchanged
+    assert plan.delta is None
+    assert plan.state == state
+
+
+def test_appended_sends_only_new_lines():
+    stored, state = uploaded(utterances('hi', 'thére'))
+
+    plan = plan_upload(DOC, utterances('hi', 'thére', 'new', 'more'), state)
+
+    assert not plan.unchanged
+    assert plan.delta['transcript'] == 'Bö: new\nAna: more'
+    assert plan.delta['base_hash'] == sha256(stored)
+    assert plan.delta['base_utterances'] == 2
+    assert merge(stored, plan.delta['transcript']) == plan.full['transcript']
+    assert plan.state['hash'] == sha256(plan.full['transcript'])
+    assert plan.state['utterances'] == 4
+
+
+def test_append_to_empty_transcript_is_full():
+    _, state = uploaded([])
+
+    plan = plan_upload(DOC, utterances('hi'), state)
+
+    assert plan.delta is None
+    assert plan.full['transcript'] == 'Bö: hi'
+
+
+def test_metadata_only_change_sends_empty_delta():
+    stored, state = uploaded(utterances('hi', 'there'))
+
+    plan = plan_upload(dict(DOC, title='Renamed'), utterances('hi', 'there'), state)
+
+    assert not plan.unchanged
+    assert plan.delta['title'] == 'Renamed'
+    assert plan.delta['transcript'] == ''
+    assert merge(stored, plan.delta['transcript']) == plan.full['transcript']
+
+
+def test_edited_prefix_falls_back_to_full():
+    _, state = uploaded(utterances('hi', 'there'))
+
+    plan = plan_upload(DOC, utterances('hi', 'edited', 'new'), state)
+
+    assert plan.delta is None
+    assert not plan.unchanged
+    assert plan.full['transcript'] == 'Bö: hi\nAna: edited\nBö: new'
+
+
+def test_edit_that_keeps_line_boundaries_is_detected():
+    # One utterance containing a newline joins to the same text as two.
+    _, state = uploaded([{'speaker': 'S', 'text': 'x\nS: y'}])
+
+    plan = plan_upload(DOC, [{'speaker': 'S', 'text': 'x'}, {'speaker': 'S', 'text': 'y'}], state)
+
+    assert plan.delta is None
+
+
+@pytest.mark.parametrize('shrunk', [utterances('hi'), [], None])
+def test_shrunk_transcript_falls_back_to_full(shrunk):
+    _, state = uploaded(utterances('hi', 'there'))
+
+    plan = plan_upload(DOC, shrunk, state)
+
+    assert plan.delta is None
+    assert not plan.unchanged
+    assert plan.state['utterances'] == len(shrunk or [])
+
+
+def test_accepts_iterators_and_records():
+    stored, state = uploaded(utterances('hi', 'there'))
+    new = utterances('hi', 'there', 'new')
+
+    from_dicts = plan_upload(DOC, iter(new), state)
+    from_records = plan_upload(Meeting.from_api(DOC), (Utterance.from_api(u) for u in new), state)
+
+    assert from_records.full == from_dicts.full
+    assert from_records.delta == from_dicts.delta
+    assert from_records.state == from_dicts.state
+    assert merge(stored, from_dicts.delta['transcript']) == from_dicts.full['transcript']
@@ -0,0 +1,127 @@
+"""Tests for configuration and sync state storage."""
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from granola_sync import config
+from granola_sync.config import JSONStore
+
+
+@pytest.fixture
+def stores(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, '_config_store', JSONStore(tmp_path / 'config.json'))
+    monkeypatch.setattr(config, '_state_store', JSONStore(tmp_path / 'state.json'))
+    return tmp_path
+
+
+INCREMENT = """
+import sys
+from granola_sync.config import JSONStore
+
+store = JSONStore(sys.argv[1])
+for _ in range(int(sys.argv[2])):
+    with store.update() as data:
+        data['count'] = data.get('count', 0) + 1
+"""
+
+
+def test_nested_updates_are_written_once(tmp_path, monkeypatch):
+    store = JSONStore(tmp_path / 'state.json')
+    writes = []
+    write = store._write
+    monkeypatch.setattr(store, '_write', lambda data: (writes.append(dict(data)), write(data)))
+
+    with store.update() as outer:
+        outer['a'] = 1
+        with store.update() as inner:
+            inner['b'] = 2
+        assert not store.path.exists()
+
+    assert writes == [{'a': 1, 'b': 2}]
+    assert json.loads(store.path.read_text()) == {'a': 1, 'b': 2}
+
+
+def test_nothing_is_written_if_the_update_raises(tmp_path):
+    store = JSONStore(tmp_path / 'state.json')
+    store.save({'a': 1})
+
+    with pytest.raises(RuntimeError):
+        with store.update() as data:
+            data['a'] = 2
+            with store.update() as inner:
+                inner['b'] = 3
+            raise RuntimeError
+
+    assert store.load() == {'a': 1}
+    assert json.loads(store.path.read_text()) == {'a': 1}
+    assert list(tmp_path.glob('*.tmp')) == []
+
+
+def test_cache_is_reused_until_the_file_changes(tmp_path, monkeypatch):
+    store = JSONStore(tmp_path / 'state.json')
+    JSONStore(store.path).save({'a': 1})
+    loads = []
+    load = json.load
+    monkeypatch.setattr(json, 'load', lambda f: loads.append(1) or load(f))
+
+    assert store.get('a') == 1
+    assert store.get('a') == 1
+    assert store.load() == {'a': 1}
+    assert len(loads) == 1
+
+    # Written by someone else, e.g. another granola-sync process
+    JSONStore(store.path).save({'a': 1, 'b': 2})
+    del loads[:]
+    assert store.get('b') == 2
+    assert len(loads) == 1
+
+    JSONStore(store.path).clear()
+    assert store.load() == {}
+
+
+@pytest.mark.skipif(config.fcntl is None, reason="no advisory file locks on this platform")
+def test_updates_from_several_processes_are_not_lost(tmp_path):
+    path = tmp_path / 'state.json'
+    env = dict(os.environ, PYTHONPATH=str(Path(config.__file__).parents[1]))
+    workers = [
+        subprocess.Popen([sys.executable, '-c', INCREMENT, str(path), '50'], env=env)
+        for _ in range(4)
+    ]
+    assert [w.wait(timeout=60) for w in workers] == [0] * 4
+
+    assert JSONStore(path).get('count') == 200
+
+
+def login(api_url, api_key):
+    with config.update_config() as cfg:
+        cfg['api_url'] = api_url
+        cfg['api_key'] = api_key
+
+
+def test_upload_state_is_kept_per_account(stores):
+    login('https://api.example.com', 'key-a')
+    config.save_upload_state({'doc-1': {'utterances': 3}})
+    config.save_upload_state({'doc-2': {'utterances': 1}})
+    assert config.load_upload_state() == {'doc-1': {'utterances': 3}, 'doc-2': {'utterances': 1}}
+
+    # Another account on the same server starts from nothing
+    login('https://api.example.com', 'key-b')
+    assert config.load_upload_state() == {}
+    config.save_upload_state({'doc-1': {'utterances': 7}})
+
+    login('https://api.example.com/', 'key-a')
+    assert config.load_upload_state()['doc-1'] == {'utterances': 3}
+
+
+def test_upload_state_survives_logout(stores):
+    login('https://api.example.com', 'key-a')
+    config.save_upload_state({'doc-1': {'utterances': 3}})
+
+    config.clear_config()
+    login('https://api.example.com', 'key-a')
+
+    assert config.load_upload_state() == {'doc-1': {'utterances': 3}}
@@ -0,0 +1,170 @@
+"""Tests for request timeouts, deadlines and hedging."""
+import threading
+import time
+
+import pytest
+import requests
+
+from granola_sync.latency import Deadline, DeadlineExceeded, RequestPolicy, RequestStats
+
+
+@pytest.fixture
+def policy():
+    policy = RequestPolicy(timeout=5, hedge=True, hedge_after=0.05)
+    yield policy
+    policy.close()
+
+
+def attempts(*behaviours):
+    """A request function whose n-th call follows the n-th behaviour.
+
+    A behaviour is ``(delay, result)``; a result that is an exception is raised.
+    """
+    calls = []
+    lock = threading.Lock()
+
+    def fn(timeout):
+        with lock:
+            n = len(calls)
+            calls.append(timeout)
+        delay, result = behaviours[n]
+        time.sleep(delay)
+        if isinstance(result, BaseException):
+            raise result
+        return result
+
+    fn.calls = calls
+    return fn
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        time.sleep(0.01)
+
+
+def test_timeout_is_capped_by_deadline():
+    policy = RequestPolicy(timeout=30, deadline=Deadline(10))
+    fn = attempts((0, 'ok'))
+
+    assert policy.call(fn, key='k') == 'ok'
+    assert 9 < fn.calls[0] <= 10
+
+
+def test_expired_deadline_refuses_requests():
+    policy = RequestPolicy(deadline=Deadline(0.01))
+    time.sleep(0.02)
+    fn = attempts((0, 'ok'))
+
+    with pytest.raises(DeadlineExceeded):
+        policy.call(fn, key='k')
+    assert fn.calls == []
+    assert policy.stats.requests == 0
+
+
+def test_without_deadline_shares_stats_and_timeout():
+    policy = RequestPolicy(timeout=7, deadline=Deadline(0.01))
+    time.sleep(0.02)
+    flush = policy.without_deadline()
+    fn = attempts((0, 'ok'))
+
+    assert flush.call(fn, key='k') == 'ok'
+    assert fn.calls == [7]
+    assert flush.stats is policy.stats
+    assert policy.stats.requests == 1
+
+
+def test_timeouts_are_counted():
+    policy = RequestPolicy()
+
+    with pytest.raises(requests.exceptions.Timeout):
+        policy.call(attempts((0, requests.exceptions.ReadTimeout())), key='k')
+    assert policy.stats.timed_out == 1
+
+
+def test_fast_request_is_not_hedged(policy):
+    assert policy.call(attempts((0, 'ok')), key='k', idempotent=True) == 'ok'
+    assert policy.stats.hedged == 0
+
+
+def test_non_idempotent_request_is_not_hedged(policy):
+    fn = attempts((0.2, 'ok'))
+
+    assert policy.call(fn, key='k') == 'ok'
+    assert len(fn.calls) == 1
+
+
+def test_hedge_wins_and_loser_is_abandoned_and_discarded(policy):
+    discarded = []
+    fn = attempts((0.5, 'slow'), (0, 'fast'))
+
+    assert policy.call(fn, key='k', idempotent=True, discard=discarded.append) == 'fast'
+    assert policy.stats.hedged == 1
+    assert policy.stats.hedge_wins == 1
+    assert policy.stats.abandoned == 1
+    wait_for(lambda: discarded == ['slow'])
+
+
+def test_primary_wins_and_hedge_is_discarded(policy):
+    discarded = []
+    fn = attempts((0.1, 'primary'), (0.5, 'hedge'))
+
+    assert policy.call(fn, key='k', idempotent=True, discard=discarded.append) == 'primary'
+    assert policy.stats.hedge_wins == 0
+    assert policy.stats.abandoned == 1
+    wait_for(lambda: discarded == ['hedge'])
+
+
+def test_losers_timeout_is_not_a_run_timeout(policy):
+    fn = attempts((0.3, requests.exceptions.ReadTimeout()), (0, 'fast'))
+
+    assert policy.call(fn, key='k', idempotent=True) == 'fast'
+    time.sleep(0.4)
+    assert policy.stats.timed_out == 0
+    assert policy.stats.abandoned == 1
+
+
+def test_failed_attempt_falls_back_to_the_other(policy):
+    fn = attempts((0.1, ValueError('boom')), (0.2, 'ok'))
+
+    assert policy.call(fn, key='k', idempotent=True) == 'ok'
+    assert policy.stats.abandoned == 0
+
+
+def test_all_attempts_failing_raises(policy):
+    fn = attempts((0.1, ValueError('first')), (0, ValueError('second')))
+
+    with pytest.raises(ValueError):
+        policy.call(fn, key='k', idempotent=True)
+
+
+def test_no_hedge_after_deadline():
+    policy = RequestPolicy(deadline=Deadline(0.05), hedge=True, hedge_after=0.1)
+    fn = attempts((0.2, 'ok'))
+    try:
+        assert policy.call(fn, key='k', idempotent=True) == 'ok'
+    finally:
+        policy.close()
+    assert len(fn.calls) == 1
+    assert policy.stats.hedged == 0
+
+
+def test_p95_needs_enough_samples():
+    stats = RequestStats()
+    for i in range(19):
+        stats.record_latency('k', i / 100)
+    assert stats.p95('k') is None
+
+    for i in range(19, 100):
+        stats.record_latency('k', i / 100)
+    assert stats.p95('k') == pytest.approx(0.94)
+
+
+def test_hedge_delay_follows_p95():
+    policy = RequestPolicy(hedge=True)
+    for _ in range(20):
+        policy.stats.record_latency('k', 0.3)
+
+    assert policy.hedge_delay('k') == pytest.approx(0.3)
+    assert policy.hedge_delay('other') == 2.0
@@ -0,0 +1,100 @@
+"""Tests for the compact Meeting and Utterance records."""
+import pytest
+
+from granola_sync.cloud import prepare_transcript_for_upload
+from granola_sync.export import export_document
+from granola_sync.models import Meeting, Utterance, as_meeting, as_utterance, extract_notes_text
+
+DOC = {
+    'id': 'doc-1',
+    'title': 'Weekly: sync/plan',
+    'created_at': '2024-05-01T10:00:00Z',
+    'summary': 'Planning',
+    'notes': {'type': 'doc', 'content': [{'type': 'p', 'content': [{'text': 'hello '}, {'text': 'world'}]}]},
+    'people': [{'name': 'Ana', 'email': 'ana@example.com'}, {'email': 'bo@example.com'}, {}, 'junk'],
+    'last_viewed_panel': {'content': 'not kept'},
+}
+UTTERANCES = [
+    {'speaker': 'Ana', 'text': 'hi', 'start_timestamp': '2024-05-01T10:00:01Z'},
+    {'text': 'no speaker'},
+]
+
+
+def test_meeting_keeps_only_the_fields_used():
+    meeting = Meeting.from_api(DOC)
+
+    assert (meeting.id, meeting.title, meeting.created_at, meeting.summary) == (
+        'doc-1', 'Weekly: sync/plan', '2024-05-01T10:00:00Z', 'Planning',
+    )
+    assert meeting.notes == 'hello world'
+    assert meeting.attendees == ('Ana', 'bo@example.com', 'Unknown')
+    assert not hasattr(meeting, '__dict__')
+
+
+def test_meeting_defaults():
+    meeting = Meeting.from_api({'people': None})
+
+    assert (meeting.id, meeting.title, meeting.created_at, meeting.summary, meeting.notes) == (
+        None, 'Untitled Meeting', '', '', '',
+    )
+    assert meeting.attendees == ()
+
+
+@pytest.mark.parametrize('doc, notes', [
+    ({'notes_plain': 'plain', 'notes_markdown': 'md', 'notes': 'tree'}, 'plain'),
+    ({'notes_plain': '', 'notes_markdown': 'md', 'notes': 'tree'}, 'md'),
+    ({'notes_markdown': None, 'notes': 'tree'}, 'tree'),
+    ({'notes': [{'text': 'a'}, {'content': [{'text': 'b'}, 'c']}, 3]}, 'abc'),
+])
+def test_notes_precedence(doc, notes):
+    assert Meeting.from_api(doc).notes == notes
+
+
+def test_extract_notes_text():
+    assert extract_notes_text(None) == ''
+    assert extract_notes_text('text') == 'text'
+    assert extract_notes_text(DOC['notes']) == 'hello world'
+
+
+def test_names_are_interned():
+    # Built at runtime so they start out as distinct objects
+    name = ''.join(['A', 'na Lopez'])
+    other = ''.join(['Ana ', 'Lopez'])
+    assert name is not other
+
+    meeting = Meeting.from_api({'people': [{'name': name}]})
+    utterance = Utterance.from_api({'speaker': other})
+
+    assert meeting.attendees[0] is utterance.speaker
+
+
+def test_utterance_defaults():
+    utterance = Utterance.from_api(UTTERANCES[1])
+
+    assert (utterance.speaker, utterance.text, utterance.start_timestamp) == ('Unknown', 'no speaker', '')
+
+
+def test_as_meeting_and_as_utterance_pass_records_through():
+    meeting = Meeting.from_api(DOC)
+    utterance = Utterance.from_api(UTTERANCES[0])
+
+    assert as_meeting(meeting) is meeting
+    assert as_utterance(utterance) is utterance
+    assert as_meeting(DOC).notes == 'hello world'
+    assert as_utterance(UTTERANCES[0]).speaker == 'Ana'
+
+
+@pytest.mark.parametrize('transcript', [UTTERANCES, [], None])
+def test_records_export_and_upload_like_raw_dicts(tmp_path, transcript):
+    records = [Utterance.from_api(u) for u in transcript] if transcript is not None else None
+    (tmp_path / 'dicts').mkdir()
+    (tmp_path / 'records').mkdir()
+
+    from_dicts = export_document(DOC, transcript, tmp_path / 'dicts')
+    from_records = export_document(Meeting.from_api(DOC), records, tmp_path / 'records')
+
+    assert from_dicts.name == from_records.name
+    assert from_dicts.read_text() == from_records.read_text()
+    assert prepare_transcript_for_upload(DOC, transcript) == prepare_transcript_for_upload(
+        Meeting.from_api(DOC), records,
+    )
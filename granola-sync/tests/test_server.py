@@ -0,0 +1,198 @@
+"""Tests for the self-hosted reference server."""
+import hashlib
+import sqlite3
+import threading
+
+import pytest
+
+from granola_sync.cloud import CloudAPIError, CloudClient
+from granola_sync.server import SCHEMA, APIError, TranscriptStore, create_server, find_snippets
+
+TRANSCRIPTS = [
+    {'id': 't1', 'title': 'Hiring sync', 'summary': 'Budget', 'transcript': 'Ana: we are HIRING\nBo: hiring hiring'},
+    {'id': 't2', 'title': 'Roadmap', 'notes': 'Grüße an das Team', 'transcript': 'Ana: "quoted" plan'},
+    {'id': 't3', 'title': 'Ops', 'transcript': 'Bo: nothing to see'},
+]
+
+
+def sha256(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def worker_search(transcripts, query):
+    """The Cloudflare worker's /api/search, minus its limit."""
+    query = query.lower()
+    results = []
+    for t in transcripts:
+        text = ' '.join(t.get(k) for k in ('title', 'summary', 'notes', 'transcript') if t.get(k)).lower()
+        if query in text:
+            results.append({
+                'id': t['id'],
+                'snippets': find_snippets(text, query),
+                'relevance': text.count(query),
+            })
+    return sorted(results, key=lambda r: r['relevance'], reverse=True)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = TranscriptStore(tmp_path / 'server.db')
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def user(store):
+    user_id = store.register('ana@example.com', 'secret')['user_id']
+    store.upsert_transcripts(user_id, TRANSCRIPTS)
+    return user_id
+
+
+def test_register_returns_key_only_for_the_right_password(store):
+    first = store.register('Ana@Example.com ', 'secret')
+
+    assert store.register('ana@example.com', 'secret')['api_key'] == first['api_key']
+    with pytest.raises(APIError) as excinfo:
+        store.register('ana@example.com', 'guess')
+    assert excinfo.value.status == 401
+    # The password was not replaced by the failed attempt
+    assert store.register('ana@example.com', 'secret')['api_key'] == first['api_key']
+    assert store.authenticate(first['api_key'])['email'] == 'ana@example.com'
+
+
+def test_upsert_counts_new_and_updated(store, user):
+    result = store.upsert_transcripts(user, [dict(TRANSCRIPTS[0], title='Renamed'), {'id': 't4'}])
+
+    assert (result['uploaded'], result['updated']) == (1, 1)
+    assert store.get_transcript(user, 't1')['title'] == 'Renamed'
+    summaries, total = store.list_transcripts(user, limit=10, offset=0)
+    assert [s['id'] for s in summaries] == ['t1', 't2', 't3', 't4']
+    assert total == 4
+
+
+def test_transcripts_are_private_to_their_user(store, user):
+    other = store.register('bo@example.com', 'pw')['user_id']
+
+    assert store.get_transcript(other, 't1') is None
+    assert store.list_transcripts(other, limit=10, offset=0) == ([], 0)
+    assert store.search(other, 'hiring', limit=10) == []
+
+
+def test_append_merges_when_base_hash_matches(store, user):
+    stored = TRANSCRIPTS[0]['transcript']
+
+    result = store.append_transcripts(user, [
+        {'id': 't1', 'title': 'Hiring sync', 'transcript': 'Ana: more', 'base_hash': sha256(stored)},
+    ])
+
+    assert result == {'appended': 1, 'rejected': []}
+    assert store.get_transcript(user, 't1')['transcript'] == stored + '\nAna: more'
+
+
+def test_append_with_stale_base_or_unknown_id_is_rejected(store, user):
+    result = store.append_transcripts(user, [
+        {'id': 't1', 'transcript': 'Ana: more', 'base_hash': sha256('something else')},
+        {'id': 'missing', 'transcript': 'Ana: more', 'base_hash': sha256('')},
+    ])
+
+    assert result == {'appended': 0, 'rejected': ['t1', 'missing']}
+    assert store.get_transcript(user, 't1')['transcript'] == TRANSCRIPTS[0]['transcript']
+
+
+def test_append_to_empty_transcript(store, user):
+    store.upsert_transcripts(user, [{'id': 'empty', 'transcript': ''}])
+
+    store.append_transcripts(user, [{'id': 'empty', 'transcript': 'Ana: first', 'base_hash': sha256('')}])
+
+    assert store.get_transcript(user, 'empty')['transcript'] == 'Ana: first'
+
+
+@pytest.mark.parametrize('query', ['hiring', 'hir', 'HIRING', 'hi', 'a', 'grüße', '"quoted"', 'budget', 'zzz'])
+def test_search_matches_the_worker(store, user, query):
+    results = store.search(user, query.lower(), limit=20)
+
+    assert [
+        {'id': r['id'], 'snippets': r['snippets'], 'relevance': r['relevance']} for r in results
+    ] == worker_search(TRANSCRIPTS, query)
+
+
+def test_search_stops_at_limit(store, user):
+    store.upsert_transcripts(user, [{'id': f'x{i}', 'transcript': 'hiring'} for i in range(30)])
+
+    assert len(store.search(user, 'hiring', limit=5)) == 5
+    assert len(store.search(user, 'hi', limit=5)) == 5
+
+
+def test_search_sees_updates(store, user):
+    store.upsert_transcripts(user, [dict(TRANSCRIPTS[2], transcript='Bo: now hiring')])
+    assert 't3' in [r['id'] for r in store.search(user, 'now hir', limit=10)]
+
+    store.upsert_transcripts(user, [dict(TRANSCRIPTS[2], transcript='Bo: gone')])
+    assert 't3' not in [r['id'] for r in store.search(user, 'now hir', limit=10)]
+
+
+def test_word_index_from_earlier_versions_is_rebuilt(tmp_path):
+    path = tmp_path / 'old.db'
+    with sqlite3.connect(path) as conn:
+        conn.executescript(SCHEMA.replace(", tokenize='trigram'", ''))
+        conn.execute(
+            "INSERT INTO transcripts (user_id, id, title, transcript, uploaded_at) "
+            "VALUES ('u', 't', 'Old', 'we are hiring', 'now')"
+        )
+    conn.close()
+
+    store = TranscriptStore(path)
+    try:
+        assert [r['id'] for r in store.search('u', 'hir', limit=10)] == ['t']
+    finally:
+        store.close()
+
+
+def test_connections_are_reused(store, user, monkeypatch):
+    opened = []
+    open_connection = store._open
+    monkeypatch.setattr(store, '_open', lambda: opened.append(1) or open_connection())
+
+    threads = [threading.Thread(target=store.search, args=(user, 'hiring', 10)) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for _ in range(20):
+        store.list_transcripts(user, limit=10, offset=0)
+
+    assert len(opened) <= 8
+
+
+@pytest.fixture
+def api_url(tmp_path):
+    server = create_server(tmp_path / 'http.db', port=0, quiet=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f'http://127.0.0.1:{server.server_address[1]}'
+    server.shutdown()
+    server.server_close()
+
+
+def test_http_round_trip(api_url):
+    key = CloudClient.register(api_url, 'ana@example.com', 'secret')['api_key']
+    client = CloudClient(api_url, key)
+
+    result = client.upload_transcripts(TRANSCRIPTS)
+    assert (result['uploaded'], result['updated']) == (3, 0)
+    result = client.append_transcripts([
+        {'id': 't3', 'transcript': 'Ana: hiring', 'base_hash': sha256(TRANSCRIPTS[2]['transcript'])},
+    ])
+    assert (result['appended'], result['rejected']) == (1, [])
+    assert [r['id'] for r in client.search('hiring')['results']] == ['t1', 't3']
+    assert client.get_stats()['totalTranscripts'] == 3
+
+
+def test_http_rejects_bad_credentials(api_url):
+    CloudClient.register(api_url, 'ana@example.com', 'secret')
+
+    with pytest.raises(CloudAPIError) as excinfo:
+        CloudClient.register(api_url, 'ana@example.com', 'guess')
+    assert excinfo.value.status == 401
+    with pytest.raises(CloudAPIError) as excinfo:
+        CloudClient(api_url, 'gra_wrong').get_stats()
+    assert excinfo.value.status == 401
@@ -0,0 +1,92 @@
+"""Tests for the incremental JSON array parser."""
+import json
+
+import pytest
+
+from granola_sync.streaming import iter_json_items
+
+UTTERANCES = [
+    {'speaker': 'Zoë', 'text': 'Grüße — 你好 👋', 'start_timestamp': '2024-01-15T10:00:00Z'},
+    {'speaker': 'Bo', 'text': 'quotes " and \\ and ] } , [ {', 'n': 12345, 'f': -1.5e3},
+    {'speaker': 'Bo', 'text': '', 'nested': {'utterances': [1, 2]}},
+    1234567890,
+    -62.5e-1,
+    None,
+]
+DOCUMENT = {
+    'id': 'doc-1',
+    'meta': {'utterances': 'not this one', 'list': [[], {}, 'a]b']},
+    'count': 4.25,
+    'utterances': UTTERANCES,
+    'after': [1, 2, 3],
+}
+
+
+def chunked(data, size):
+    return (data[i:i + size] for i in range(0, len(data), size))
+
+
+@pytest.mark.parametrize('size', [1, 2, 3, 5, 7, 64, 1 << 16])
+def test_object_with_arbitrary_chunk_boundaries(size):
+    data = json.dumps(DOCUMENT, ensure_ascii=False, indent=1).encode('utf-8')
+
+    assert list(iter_json_items(chunked(data, size), 'utterances')) == UTTERANCES
+
+
+@pytest.mark.parametrize('size', [1, 2, 3, 4, 5])
+def test_bare_array(size):
+    data = json.dumps(UTTERANCES, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    assert list(iter_json_items(chunked(data, size), 'utterances')) == UTTERANCES
+
+
+def test_every_two_chunk_split():
+    data = json.dumps(DOCUMENT, ensure_ascii=False).encode('utf-8')
+
+    for split in range(1, len(data)):
+        assert list(iter_json_items([data[:split], data[split:]], 'utterances')) == UTTERANCES, split
+
+
+def test_every_split_of_multibyte_characters():
+    data = json.dumps(['€', '😀', 'ж'], ensure_ascii=False).encode('utf-8')
+
+    for split in range(1, len(data)):
+        chunks = [data[:split], data[split:]]
+        assert list(iter_json_items(chunks, 'utterances')) == ['€', '😀', 'ж']
+
+
+def test_number_split_across_chunks():
+    chunks = [b'{"utterances": [12', b'34', b'5, 6.', b'25e', b'1]}']
+
+    assert list(iter_json_items(chunks, 'utterances')) == [12345, 62.5]
+
+
+def test_empty_chunks_and_whitespace():
+    chunks = [b'', b'  {', b'', b' "utterances" ', b':', b' [ ', b'', b' ] ', b'}', b'']
+
+    assert list(iter_json_items(chunks, 'utterances')) == []
+
+
+@pytest.mark.parametrize('data', [b'{}', b'{"other": [1]}', b'{"utterances": null}', b'null', b''])
+def test_missing_array_yields_nothing(data):
+    assert list(iter_json_items([data], 'utterances')) == []
+
+
+def test_items_are_yielded_before_the_stream_ends():
+    consumed = []
+
+    def chunks():
+        for chunk in (b'[{"a": 1},', b' {"a": 2}', b']'):
+            consumed.append(chunk)
+            yield chunk
+
+    items = iter_json_items(chunks(), 'utterances')
+
+    assert next(items) == {'a': 1}
+    assert len(consumed) == 1
+
+
+@pytest.mark.parametrize('data', [b'[1, 2', b'[1 2]', b'{"utterances": [1,]}', b'{"utterances" [1]}'])
+def test_malformed_input_raises(data):
+    with pytest.raises(ValueError):
+        list(iter_json_items(chunked(data, 3), 'utterances'))